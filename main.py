@@ -6,6 +6,7 @@ Main entry point for SIR Data Scraper - Refactored 3-Stage Pipeline
 import argparse
 import asyncio
 import sys
+from contextlib import aclosing
 from pathlib import Path
 from typing import Optional
 
@@ -19,6 +20,13 @@ from scraper.db_loader import DBLoader
 from scraper.checkpoint import CheckpointManager
 from scraper.pipeline import Pipeline
 
+# Optional faster event loop (libuv-based; not available on Windows)
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
 
 class SIRScraper:
     """Main orchestrator for the SIR data scraping pipeline."""
@@ -33,7 +41,12 @@ class SIRScraper:
         db_path: str = "data/voters.db",
         headless: bool = True,
         max_parse_workers: int = 4,
-        max_translate_workers: int = 4
+        max_translate_workers: int = 4,
+        pipeline_concurrency: int = 2,
+        max_concurrent_downloads: int = 10,
+        requests_per_second: float = 10.0,
+        pretty_checkpoints: bool = False,
+        crawl_concurrency: int = 5
     ):
         self.state_filter = state_filter
         self.max_assemblies = max_assemblies
@@ -43,16 +56,26 @@ class SIRScraper:
         self.db_path = db_path
         self.max_parse_workers = max_parse_workers
         self.max_translate_workers = max_translate_workers
+        self.pipeline_concurrency = max(1, pipeline_concurrency)
         
         # Initialize components
         self.logger = Logger(save_logs=save_logs)
-        self.crawler = Crawler(self.logger, headless=headless)
-        self.downloader = Downloader(self.logger, max_concurrent=5)  # Parallel downloads
+        self.crawler = Crawler(
+            self.logger,
+            headless=headless,
+            requests_per_second=requests_per_second,
+            max_concurrent_pages=crawl_concurrency
+        )
+        self.downloader = Downloader(
+            self.logger,
+            max_concurrent=max_concurrent_downloads,  # Parallel downloads
+            requests_per_second=requests_per_second
+        )
         self.extractor = Extractor(self.logger)
         self.parser = Parser(self.logger, use_ocr=True)
         self.translator = VoterTranslator(self.logger, enabled=translate, max_workers=max_translate_workers) if translate else None
         self.db_loader = DBLoader(db_path)
-        self.checkpoint = CheckpointManager()
+        self.checkpoint = CheckpointManager(pretty=pretty_checkpoints, logger=self.logger)
         
         # Create pipeline
         self.pipeline = Pipeline(
@@ -76,6 +99,7 @@ class SIRScraper:
             self.logger.info("Stage 1: Download (parallel, skip if exists)")
             self.logger.info("Stage 2: Parse (parallel within constituency)")
             self.logger.info("Stage 3: Store (database)")
+            self.logger.info(f"Constituencies in parallel: {self.pipeline_concurrency}")
             self.logger.info("="*80)
             
             # Check resume status
@@ -84,43 +108,33 @@ class SIRScraper:
                 incomplete = self.checkpoint.get_incomplete_constituencies()
                 if incomplete:
                     self.logger.info(f"Found {len(incomplete)} incomplete constituency(ies)")
-                    for key in incomplete:
-                        self.logger.info(f"  - {key}")
+                    for state, assembly in incomplete:
+                        self.logger.info(f"  - {state}/{assembly}")
                 else:
                     self.logger.info("No incomplete constituencies found")
             
-            # Group URLs by state/assembly
-            url_groups = {}
+            # Crawl and process concurrently: each assembly is handed to the
+            # pipeline as soon as its URLs are collected
+            self.logger.info("\nExtracting download URLs (pipeline starts with the first assembly)...")
+            queue: asyncio.Queue = asyncio.Queue(maxsize=4)
+            producer = asyncio.create_task(self._produce_assemblies(queue))
+            try:
+                # A failing crawler still ends the queue, so the consumer finishes the
+                # assemblies it started (before cleanup closes the checkpoint and DB)
+                assembly_count = await self._consume_assemblies(queue)
+            finally:
+                if not producer.done():
+                    producer.cancel()  # The consumer failed: nothing reads the crawler's batches
+                    await asyncio.gather(producer, return_exceptions=True)
+            await producer  # Raises the crawler's error, if it had one
+            self.logger.info(f"Found URLs for {assembly_count} assembly(ies)")
             
-            self.logger.info("\nExtracting download URLs...")
-            async for url_data in self.crawler.crawl_all(
-                state_filter=self.state_filter,
-                max_assemblies=self.max_assemblies,
-                use_checkpoint=self.resume
-            ):
-                key = (url_data['state'], url_data['assembly'])
-                if key not in url_groups:
-                    url_groups[key] = []
-                url_groups[key].append(url_data)
+            # Indexes are built once, after all inserts (no-op for those that already exist)
+            self.logger.info("Creating database indexes...")
+            await asyncio.to_thread(self.db_loader.create_indexes)
             
-            self.logger.info(f"Found URLs for {len(url_groups)} assembly(ies)")
-            self.logger.info("Browser closed. Starting pipeline...")
-            
-            # Process each assembly through 3 stages
-            base_dir = Path("data/voterlists")
-            for (state, assembly), urls in url_groups.items():
-                # Check if already complete
-                if self.resume and self.checkpoint.is_constituency_complete(state, assembly):
-                    self.logger.info(f"\nSkipping completed constituency: {state}/{assembly}")
-                    continue
-                
-                # Process through pipeline
-                await self.pipeline.process_constituency(
-                    state, assembly, urls, base_dir
-                )
-            
-            # Print final stats
-            stats = self.db_loader.get_stats()
+            # Print final stats (DB queries off the event loop)
+            stats = await asyncio.to_thread(self.db_loader.get_stats)
             self.logger.info(f"\n{'='*80}")
             self.logger.info("FINAL STATISTICS")
             self.logger.info(f"{'='*80}")
@@ -137,10 +151,83 @@ class SIRScraper:
             self.logger.debug(traceback.format_exc())
             raise
         finally:
-            self.cleanup()
+            # Joins parse workers, flushes checkpoints and closes the DB
+            await asyncio.to_thread(self.cleanup)
+    
+    async def _produce_assemblies(self, queue: asyncio.Queue):
+        """Crawl URLs and queue them per (state, assembly) batch, as the crawler finishes each."""
+        seen_urls = set()  # The crawler can re-emit a URL (e.g. across index pages)
+        cancelled = False
+        
+        try:
+            async with aclosing(self.crawler.crawl_batches(
+                state_filter=self.state_filter,
+                max_assemblies=self.max_assemblies,
+                use_checkpoint=self.resume
+            )) as batches:
+                async for state, assembly, urls in batches:
+                    new_urls = []
+                    for url_data in urls:
+                        if url_data['url'] in seen_urls:
+                            self.logger.debug(f"Skipping duplicate URL: {url_data['url']}")
+                            continue
+                        seen_urls.add(url_data['url'])
+                        new_urls.append(url_data)
+                    if new_urls:
+                        await queue.put(((state, assembly), new_urls))
+        except asyncio.CancelledError:
+            cancelled = True  # Only once the consumer has stopped reading (see run)
+            raise
+        finally:
+            # End marker for the consumer, whether the crawl finished or failed
+            if not cancelled:
+                await queue.put(None)
+    
+    async def _consume_assemblies(self, queue: asyncio.Queue) -> int:
+        """Process queued assemblies through the 3-stage pipeline. Returns assemblies seen."""
+        base_dir = Path("data/voterlists")
+        completed = self.checkpoint.get_completed_set() if self.resume else frozenset()
+        semaphore = asyncio.Semaphore(self.pipeline_concurrency)
+        tasks = {}
+        count = 0
+        
+        async def process(state: str, assembly: str, urls: list, previous: Optional[asyncio.Task]):
+            try:
+                # A repeated batch for the same assembly waits for the earlier one
+                if previous:
+                    await previous
+                await self.pipeline.process_constituency(
+                    state, assembly, urls, base_dir
+                )
+            finally:
+                semaphore.release()
+        
+        try:
+            while (item := await queue.get()) is not None:
+                (state, assembly), urls = item
+                count += 1
+                
+                # Check if already complete
+                if (state, assembly) in completed:
+                    self.logger.info(f"\nSkipping completed constituency: {state}/{assembly}")
+                    continue
+                
+                # Acquire before spawning so the crawler queue still applies backpressure
+                await semaphore.acquire()
+                previous = tasks.get((state, assembly))
+                tasks[(state, assembly)] = asyncio.create_task(process(state, assembly, urls, previous))
+        finally:
+            # Every started assembly runs to the end, even if this loop failed
+            results = await asyncio.gather(*tasks.values(), return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return count
     
     def cleanup(self):
         """Cleanup resources."""
+        self.pipeline.close()
+        self.checkpoint.close()
         self.logger.close()
         self.db_loader.close()
 
@@ -215,6 +302,40 @@ def main():
         help='Number of parallel workers for translation (default: 4)'
     )
     
+    parser.add_argument(
+        '--pipeline-concurrency',
+        type=int,
+        default=2,
+        help='Number of constituencies processed in parallel (default: 2)'
+    )
+    
+    parser.add_argument(
+        '--crawl-concurrency',
+        type=int,
+        default=5,
+        help='Number of assemblies crawled in parallel browser contexts (default: 5)'
+    )
+    
+    parser.add_argument(
+        '--download-concurrency',
+        type=int,
+        default=10,
+        help='Maximum simultaneous downloads (default: 10)'
+    )
+    
+    parser.add_argument(
+        '--rate-limit',
+        type=float,
+        default=10.0,
+        help='Maximum requests per second to the portal and download servers (default: 10)'
+    )
+    
+    parser.add_argument(
+        '--pretty-checkpoints',
+        action='store_true',
+        help='Indent latest.json for easier reading (slower checkpoint saves)'
+    )
+    
     args = parser.parse_args()
     
     # Determine headless mode
@@ -230,12 +351,18 @@ def main():
         db_path=args.db,
         headless=headless,
         max_parse_workers=args.parse_workers,
-        max_translate_workers=args.translate_workers
+        max_translate_workers=args.translate_workers,
+        pipeline_concurrency=args.pipeline_concurrency,
+        max_concurrent_downloads=args.download_concurrency,
+        requests_per_second=args.rate_limit,
+        pretty_checkpoints=args.pretty_checkpoints,
+        crawl_concurrency=args.crawl_concurrency
     )
     
-    # Run async pipeline
+    # Run async pipeline (on uvloop when installed)
+    run = uvloop.run if UVLOOP_AVAILABLE else asyncio.run
     try:
-        asyncio.run(scraper.run())
+        run(scraper.run())
     except KeyboardInterrupt:
         print("\nExiting...")
         sys.exit(0)
@@ -2,20 +2,68 @@
 Checkpoint management for tracking processing progress
 """
 
-import json
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import Future
 from pathlib import Path
-from typing import Dict, Any, Optional
-from datetime import datetime
-from .utils import ensure_dir
+from typing import Dict, Any, FrozenSet, List, Optional, Tuple
+from datetime import datetime, timezone
+from .logger import Logger
+from .utils import ensure_dir, dumps_json as _dumps, loads_json as _loads
 
 
 class CheckpointManager:
     """Manages checkpoints for download, parse, and DB stages."""
     
-    def __init__(self, checkpoint_dir: Path = Path("data/checkpoints")):
+    def __init__(
+        self,
+        checkpoint_dir: Path = Path("data/checkpoints"),
+        flush_every: int = 10,
+        history_max_bytes: int = 64 * 1024 * 1024,
+        pretty: bool = False,
+        logger: Optional[Logger] = None
+    ):
+        # Reports failed background writes (without a Logger: to the same "sir_scraper" logger it wraps)
+        self.logger = logger or logging.getLogger("sir_scraper")
         self.checkpoint_dir = ensure_dir(checkpoint_dir)
         self.latest_file = self.checkpoint_dir / "latest.json"
-        self.checkpoints_dir = ensure_dir(self.checkpoint_dir / "history")
+        self.history_file = self.checkpoint_dir / "history.jsonl"
+        self.flush_every = max(1, flush_every)
+        self.history_max_bytes = history_max_bytes
+        self.pretty = pretty  # Indent latest.json for reading by hand (history stays compact)
+        
+        # In-memory copy of latest.json keyed by (state, assembly), mutated on every
+        # save and flushed periodically. "state/assembly" strings exist only on disk.
+        latest = self.load_latest()
+        if latest is None and self.latest_file.exists():
+            latest = self._rebuild_from_history()  # latest.json is unreadable
+        latest = latest or {}
+        self._constituencies: Dict[Tuple[str, str], Dict[str, Any]] = {
+            self._key_from_disk(key, status): status
+            for key, status in latest.get('constituencies', {}).items()
+        }
+        self._last_updated = latest.get('last_updated')
+        # Fully processed constituencies, kept in step with _constituencies
+        self._complete = {
+            key for key, status in self._constituencies.items()
+            if self._is_complete(status)
+        }
+        # Each stage checkpoint serialized once, when saved; latest.json is assembled from these
+        self._fragments: Dict[Tuple[str, str], Dict[str, bytes]] = {
+            key: {stage: _dumps(checkpoint) for stage, checkpoint in status.items()}
+            for key, status in self._constituencies.items()
+        }
+        self._pending = 0
+        self._lock = threading.Lock()  # Stages of different constituencies run in worker threads
+        
+        # Append-only history (one JSON object per line), written behind by a background
+        # thread so pipeline stages don't wait on checkpoint I/O
+        self._history_fp = open(self.history_file, 'ab', buffering=1 << 16)
+        self._writes: queue.Queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="checkpoint-writer", daemon=True)
+        self._writer.start()
     
     def load_latest(self) -> Optional[Dict[str, Any]]:
         """Load the latest checkpoint."""
@@ -23,11 +71,40 @@ class CheckpointManager:
             return None
         
         try:
-            with open(self.latest_file, 'r') as f:
-                return json.load(f)
+            with open(self.latest_file, 'rb') as f:
+                return _loads(f.read())
         except Exception:
             return None
     
+    def _rebuild_from_history(self) -> Dict[str, Any]:
+        """Rebuild latest.json contents by replaying history files (oldest first)."""
+        constituencies: Dict[str, Dict[str, Any]] = {}
+        last_updated = None
+        rotated = sorted(self.checkpoint_dir.glob("history.*.jsonl"))
+        for history_file in rotated + [self.history_file]:
+            if not history_file.exists():
+                continue
+            with open(history_file, 'rb') as f:
+                for line in f:
+                    try:
+                        checkpoint = _loads(line)
+                    except Exception:
+                        continue  # Line cut short by a crash
+                    key = f"{checkpoint['state']}/{checkpoint['assembly']}"
+                    constituencies.setdefault(key, {})[checkpoint['stage']] = checkpoint
+                    last_updated = checkpoint['timestamp']
+        return {'constituencies': constituencies, 'last_updated': last_updated}
+    
+    @staticmethod
+    def _key_from_disk(key: str, status: Dict[str, Any]) -> Tuple[str, str]:
+        """Recover (state, assembly) for a latest.json key."""
+        # Stage entries carry the names, which stay correct even if they contain '/'
+        for checkpoint in status.values():
+            if isinstance(checkpoint, dict) and 'state' in checkpoint and 'assembly' in checkpoint:
+                return (checkpoint['state'], checkpoint['assembly'])
+        state, _, assembly = key.partition('/')
+        return (state, assembly)
+    
     def save_checkpoint(
         self,
         state: str,
@@ -37,67 +114,139 @@ class CheckpointManager:
         data: Dict[str, Any]
     ):
         """Save checkpoint for a constituency stage."""
+        timestamp = datetime.now(timezone.utc).isoformat()
         checkpoint = {
             'state': state,
             'assembly': assembly,
             'stage': stage,
             'status': status,
-            'timestamp': datetime.utcnow().isoformat(),
+            'timestamp': timestamp,
             'data': data
         }
         
-        # Update latest
-        latest = self.load_latest() or {}
-        if 'constituencies' not in latest:
-            latest['constituencies'] = {}
-        
-        key = f"{state}/{assembly}"
-        if key not in latest['constituencies']:
-            latest['constituencies'][key] = {}
-        
-        latest['constituencies'][key][stage] = checkpoint
-        latest['last_updated'] = datetime.utcnow().isoformat()
+        # Serialize now, so later changes to data by the caller can't race the writer
+        fragment = _dumps(checkpoint)
         
-        # Save latest
-        with open(self.latest_file, 'w') as f:
-            json.dump(latest, f, indent=2)
+        with self._lock:
+            # Update latest (in memory)
+            key = (state, assembly)
+            status_by_stage = self._constituencies.setdefault(key, {})
+            status_by_stage[stage] = checkpoint
+            self._fragments.setdefault(key, {})[stage] = fragment
+            if self._is_complete(status_by_stage):
+                self._complete.add(key)
+            else:
+                self._complete.discard(key)
+            self._last_updated = timestamp
         
-        # Save timestamped copy
-        timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-        history_file = self.checkpoints_dir / f"{timestamp}_{state}_{assembly}_{stage}.json"
-        with open(history_file, 'w') as f:
-            json.dump(checkpoint, f, indent=2)
+        # Disk writes happen on the writer thread. DB stage saves wait until they are flushed
+        # (and synced): losing 'completed' would re-insert the constituency's records on resume,
+        # and losing 'in_progress' (written before any insert) would skip deleting the rows an
+        # interrupted run left. If that write fails, the error is raised here.
+        durable = Future() if stage == 'db' else None
+        if not self._writer.is_alive():
+            raise RuntimeError("CheckpointManager is closed")
+        self._writes.put((fragment, durable))
+        if durable is not None:
+            durable.result()
         
         return checkpoint
     
+    def _write_loop(self):
+        """Writer thread: append queued checkpoints to history, flush latest.json every N."""
+        while True:
+            item = self._writes.get()
+            durable = None
+            try:
+                if item is None:
+                    return
+                fragment, durable = item
+                
+                # Append to history (rotate once it grows past history_max_bytes)
+                self._history_fp.write(fragment + b"\n")
+                if self._history_fp.tell() >= self.history_max_bytes:
+                    self._rotate_history()
+                
+                self._pending += 1
+                if self._pending >= self.flush_every or durable is not None:
+                    self._flush(sync=durable is not None)
+                if durable is not None:
+                    durable.set_result(None)
+            except Exception as e:
+                if durable is not None:
+                    durable.set_exception(e)  # save_checkpoint raises it in the waiting stage
+                else:
+                    self.logger.error(f"Checkpoint write failed: {e}")
+            finally:
+                self._writes.task_done()
+    
+    def _flush(self, sync: bool = False):
+        """Write the in-memory checkpoint to latest.json atomically (fsync first if sync)."""
+        with self._lock:
+            constituencies = b",".join(
+                _dumps(f"{state}/{assembly}") + b":{" + b",".join(
+                    _dumps(stage) + b":" + fragment for stage, fragment in stages.items()
+                ) + b"}"
+                for (state, assembly), stages in self._fragments.items()
+            )
+            latest = b'{"constituencies":{' + constituencies + b'},"last_updated":' + _dumps(self._last_updated) + b"}"
+        if self.pretty:
+            latest = _dumps(_loads(latest), pretty=True)
+        
+        tmp_file = self.latest_file.with_suffix('.json.tmp')
+        with open(tmp_file, 'wb') as f:
+            f.write(latest)
+            if sync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_file, self.latest_file)
+        self._history_fp.flush()
+        self._pending = 0
+    
+    def _rotate_history(self):
+        """Move history.jsonl aside as history.<timestamp>.jsonl and start a new file."""
+        self._history_fp.close()
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S_%f")
+        os.replace(self.history_file, self.checkpoint_dir / f"history.{stamp}.jsonl")
+        self._history_fp = open(self.history_file, 'ab', buffering=1 << 16)
+    
+    def close(self):
+        """Write out queued checkpoints, stop the writer thread and close the history file."""
+        if not self._writer.is_alive():
+            return
+        self._writes.put(None)
+        self._writer.join()
+        if self._pending:
+            self._flush()
+        self._history_fp.close()
+    
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+    
     def get_constituency_status(self, state: str, assembly: str) -> Dict[str, Any]:
         """Get status of a specific constituency."""
-        latest = self.load_latest()
-        if not latest:
-            return {}
-        
-        key = f"{state}/{assembly}"
-        return latest.get('constituencies', {}).get(key, {})
+        return self._constituencies.get((state, assembly), {})
     
-    def is_constituency_complete(self, state: str, assembly: str) -> bool:
-        """Check if a constituency is fully processed (all stages complete)."""
-        status = self.get_constituency_status(state, assembly)
+    @staticmethod
+    def _is_complete(status: Dict[str, Any]) -> bool:
+        """Check if all three stages in a constituency status are complete."""
         return (
             status.get('download', {}).get('status') == 'completed' and
             status.get('parse', {}).get('status') == 'completed' and
             status.get('db', {}).get('status') == 'completed'
         )
     
-    def get_incomplete_constituencies(self) -> list:
-        """Get list of constituencies that are not fully processed."""
-        latest = self.load_latest()
-        if not latest:
-            return []
-        
-        incomplete = []
-        for key, status in latest.get('constituencies', {}).items():
-            if not self.is_constituency_complete(*key.split('/', 1)):
-                incomplete.append(key)
-        
-        return incomplete
-
+    def is_constituency_complete(self, state: str, assembly: str) -> bool:
+        """Check if a constituency is fully processed (all stages complete)."""
+        return (state, assembly) in self._complete
+    
+    def get_completed_set(self) -> FrozenSet[Tuple[str, str]]:
+        """Get (state, assembly) pairs of all fully processed constituencies."""
+        return frozenset(self._complete)
+    
+    def get_incomplete_constituencies(self) -> List[Tuple[str, str]]:
+        """Get (state, assembly) pairs of constituencies that are not fully processed."""
+        return [key for key in self._constituencies if key not in self._complete]
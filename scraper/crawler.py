@@ -2,603 +2,818 @@
 Web crawler using Playwright to extract ZIP download URLs from SIR portal
 """
 
+import aiohttp
 import asyncio
-from typing import List, Dict, Any, Optional, Iterator
-from playwright.async_api import async_playwright, Browser, Page
+from contextlib import aclosing
+from typing import List, Dict, Any, AsyncIterator, Optional, Tuple
+from playwright.async_api import async_playwright, Browser, BrowserContext, Locator, Page, Playwright, Route
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+from aiolimiter import AsyncLimiter
 import json
+import os
+import time
+import traceback
+from html.parser import HTMLParser
 from pathlib import Path
+from urllib.parse import urljoin, urlparse
 
-from .utils import save_checkpoint, load_checkpoint, sanitize_filename
+from .utils import save_checkpoint, load_checkpoint, sanitize_filename, ensure_dir
 from .logger import Logger
 
 
+class _DirectLinkParser(HTMLParser):
+    """
+    Collect download links from static HTML in the shape DIRECT_LINKS_JS returns:
+    resolved href, link text, texts of the cells in the link's table row and the
+    index of the cell holding the link (-1 if not in a cell).
+    """
+    
+    def __init__(self, base_url: str):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.links: List[Dict[str, Any]] = []
+        self._table_depth = 0
+        self._rows: List[Dict[str, Any]] = []  # Open <tr>s, innermost last
+        self._anchor: Optional[Dict[str, Any]] = None
+    
+    @staticmethod
+    def _is_download(href: str) -> bool:
+        href = href.lower()
+        return '.zip' in href or '.pdf' in href or 'download' in href
+    
+    def _close_row(self):
+        row = self._rows.pop()
+        cells = [' '.join(''.join(cell).split()) for cell in row['cells']]
+        for link in row['links']:
+            link['cells'] = cells
+    
+    def handle_starttag(self, tag, attrs):
+        row = self._rows[-1] if self._rows else None
+        if tag == 'table':
+            self._table_depth += 1
+        elif tag == 'tr':
+            if row and row['depth'] == self._table_depth:
+                self._close_row()  # Previous <tr> without an end tag
+            self._rows.append({'depth': self._table_depth, 'cells': [], 'in_cell': False, 'links': []})
+        elif tag == 'td' and row:
+            row['cells'].append([])
+            row['in_cell'] = True
+        elif tag == 'a':
+            href = dict(attrs).get('href')
+            if href and self._is_download(href):
+                in_cell = bool(row and row['in_cell'])
+                self._anchor = {
+                    'href': urljoin(self.base_url, href),
+                    'text': [],
+                    'cells': [],
+                    'linkCell': len(row['cells']) - 1 if in_cell else -1
+                }
+                self.links.append(self._anchor)
+                if in_cell:
+                    row['links'].append(self._anchor)
+    
+    def handle_endtag(self, tag):
+        if tag == 'a' and self._anchor:
+            self._anchor['text'] = ' '.join(''.join(self._anchor['text']).split())
+            self._anchor = None
+        elif tag == 'td' and self._rows:
+            self._rows[-1]['in_cell'] = False
+        elif tag == 'tr' and self._rows and self._rows[-1]['depth'] == self._table_depth:
+            self._close_row()
+        elif tag == 'table' and self._table_depth:
+            while self._rows and self._rows[-1]['depth'] == self._table_depth:
+                self._close_row()
+            self._table_depth -= 1
+    
+    def handle_data(self, data):
+        if self._anchor:
+            self._anchor['text'].append(data)
+        if self._rows and self._rows[-1]['in_cell']:
+            self._rows[-1]['cells'][-1].append(data)
+    
+    def close(self):
+        super().close()
+        while self._rows:
+            self._close_row()
+        if self._anchor:
+            self.handle_endtag('a')
+
+
 class Crawler:
     """Crawler to extract ZIP URLs from SIR portal."""
     
     SIR_URL = "https://voters.eci.gov.in/searchInSIR/S2UA4DPDF-JK4QWODSE"
     
+    # React Select dropdown controls (state first, assembly second) and their menu options
+    SELECT_CONTROL_SELECTOR = 'div.css-13cymwt-control'
+    OPTION_SELECTOR = 'div[role="listbox"] div[role="option"]'
+    STATE_INPUT_NAME = "stateCd"  # Hidden input holding the selected state code
+    
+    # Fail fast on unresponsive pages: navigations time out after 15s and are retried twice;
+    # a state whose form fails for this many assemblies in a row is skipped for the run
+    NAVIGATION_TIMEOUT = 15000
+    NAVIGATION_RETRIES = 2
+    STATE_FAILURE_LIMIT = 2
+    
+    # JS setting a React-controlled hidden input through the native value setter (a plain
+    # assignment is swallowed by React's change tracking); returns false if there is no input
+    REACT_SET_VALUE_JS = """(args) => {
+        const input = document.querySelector(`input[name="${args.name}"]`);
+        if (!input) return false;
+        const setter = Object.getOwnPropertyDescriptor(window.HTMLInputElement.prototype, 'value').set;
+        setter.call(input, args.value);
+        input.dispatchEvent(new Event('input', { bubbles: true }));
+        input.dispatchEvent(new Event('change', { bubbles: true }));
+        return true;
+    }"""
+    
+    # JS returning the hrefs of all ZIP links on the page, newline-joined
+    ZIP_HREFS_JS = """() => Array.from(document.querySelectorAll('a[href*=".zip" i]')).map(a => a.href).join('\\n')"""
+    # JS returning the ZIP links on the page as {href, text}; a.href is resolved against the page URL
+    ZIP_LINKS_JS = """() => Array.from(document.querySelectorAll('a[href*=".zip" i]'))
+        .filter(a => a.getAttribute('href'))
+        .map(a => ({href: a.href, text: a.innerText.trim()}))"""
+    
+    # Requests the crawler never needs: aborted on every context when block_resources is on
+    # (React Select styles are injected inline, so the dropdowns work without stylesheets)
+    BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "media", "stylesheet"})
+    BLOCKED_HOSTS = (
+        "google-analytics.com", "googletagmanager.com", "doubleclick.net",
+        "facebook.net", "hotjar.com", "clarity.ms"
+    )
+    
+    # JS returning, for every download link on a direct state page, its resolved URL, its
+    # text, the texts of the cells in its table row and the index of the cell holding it
+    DIRECT_LINKS_JS = """() => Array.from(
+        document.querySelectorAll('a[href*=".zip" i], a[href*=".pdf" i], a[href*="download" i]')
+    ).filter(a => a.getAttribute('href')).map(a => {
+        const row = a.closest('tr');
+        const cells = row ? Array.from(row.querySelectorAll('td')) : [];
+        return {
+            href: a.href,
+            text: a.innerText.trim(),
+            cells: cells.map(td => td.innerText.trim()),
+            linkCell: cells.findIndex(td => td.contains(a))
+        };
+    })"""
+    # Option texts that are dropdown placeholders rather than states / assemblies
+    STATE_PLACEHOLDERS = frozenset({'select state', 'select', 'choose state', '--select--', ''})
+    ASSEMBLY_PLACEHOLDERS = frozenset({'select assembly', 'select', 'choose assembly', '--select--', ''})
+    # Cell and link texts that are never an assembly name; cells ending in a file name are skipped too
+    NON_ASSEMBLY_TEXTS = frozenset({'download', 'click here', 'link', ''})
+    DOWNLOAD_EXTENSIONS = ('.zip', '.pdf', '.ZIP', '.PDF')
+    
+    # State codes (the stateCd value) known without opening the state dropdown
+    KNOWN_STATE_CODES = {
+        "Gujarat": "S06"
+    }
+    
     # Direct state URLs (for bypassing React Select when needed)
     STATE_DIRECT_URLS = {
         "Gujarat": "https://erms.gujarat.gov.in/ceo-gujarat/master/voterlist2002.aspx"
     }
     
-    def __init__(self, logger: Logger, checkpoint_path: str = "data/checkpoint.json", headless: bool = True):
+    def __init__(
+        self,
+        logger: Logger,
+        checkpoint_path: str = "data/checkpoint.json",
+        urls_path: str = "data/urls.jsonl",
+        checkpoint_every: int = 10,
+        checkpoint_interval: float = 5.0,
+        headless: bool = True,
+        requests_per_second: float = 10.0,
+        max_concurrent_pages: int = 5,
+        block_resources: bool = True,
+        storage_state_path: Optional[str] = "data/storage_state.json"
+    ):
         self.logger = logger
         self.checkpoint_path = checkpoint_path
+        self.urls_path = urls_path  # Every URL found, appended as it is yielded (checkpoint mode)
+        self.checkpoint_every = max(1, checkpoint_every)  # Assemblies between checkpoint saves
+        self.checkpoint_interval = checkpoint_interval  # ...or seconds, whichever comes first
         self.headless = headless
+        self.max_concurrent_pages = max(1, max_concurrent_pages)
+        self.block_resources = block_resources
+        # Cookies/local storage saved at close and loaded into new contexts next run (None: off)
+        self.storage_state_path = storage_state_path
+        self._storage_state: Optional[str] = None  # storage_state_path, once it is known to exist
+        self.playwright: Optional[Playwright] = None
         self.browser: Optional[Browser] = None
-        self.page: Optional[Page] = None
+        self._context_pool: Optional[asyncio.Queue] = None  # Warm contexts for the crawl workers
+        self._discovery_context: Optional[BrowserContext] = None  # Context of crawl_all's own page
+        self.rate_limiter = AsyncLimiter(requests_per_second, 1.0)  # Page navigations per second
+        
+        # Filled by get_states / _get_state_code and reused for every later lookup
+        self._states_cache: Optional[List[str]] = None
+        self._state_code_cache: Dict[str, str] = dict(self.KNOWN_STATE_CODES)
+        # Consecutive failed assemblies per state (circuit breaker for _crawl_worker)
+        self._state_failures: Dict[str, int] = {}
     
     async def initialize(self):
         """Initialize Playwright browser."""
-        playwright = await async_playwright().start()
-        self.browser = await playwright.chromium.launch(headless=self.headless)
-        self.page = await self.browser.new_page()
-        self.logger.info(f"Browser initialized (headless={self.headless})")
+        self.playwright = await async_playwright().start()
+        self.browser = await self.playwright.chromium.launch(headless=self.headless)
+        if self.storage_state_path and os.path.exists(self.storage_state_path):
+            self._storage_state = self.storage_state_path
+        
+        # One browser, one context per concurrent page: contexts are created up front
+        # and handed from worker to worker instead of being opened for every state
+        contexts = await asyncio.gather(*(self._new_context() for _ in range(self.max_concurrent_pages)))
+        self._context_pool = asyncio.Queue()
+        for context in contexts:
+            self._context_pool.put_nowait(context)
+        self.logger.info(f"Browser initialized (headless={self.headless}, contexts={len(contexts)})")
+    
+    async def _new_context(self) -> BrowserContext:
+        """Create a browser context (with the saved session, if any), blocking unneeded resources if enabled."""
+        try:
+            context = await self.browser.new_context(storage_state=self._storage_state)
+        except Exception as e:
+            if self._storage_state is None:
+                raise
+            self.logger.warning(f"Ignoring unreadable storage state {self._storage_state}: {e}")
+            self._storage_state = None
+            context = await self.browser.new_context()
+        context.set_default_timeout(self.NAVIGATION_TIMEOUT)  # Clicks etc. (Playwright's default is 30s)
+        if self.block_resources:
+            await context.route("**/*", self._block_route)
+        return context
+    
+    async def _block_route(self, route: Route):
+        """Abort images, fonts, media, stylesheets and analytics; let everything else through."""
+        request = route.request
+        if request.resource_type in self.BLOCKED_RESOURCE_TYPES:
+            await route.abort()
+            return
+        host = urlparse(request.url).hostname or ""
+        if any(host == blocked or host.endswith("." + blocked) for blocked in self.BLOCKED_HOSTS):
+            await route.abort()
+            return
+        await route.continue_()
+    
+    async def _acquire_context(self) -> BrowserContext:
+        """Take a context from the pool (waits if all are in use)."""
+        return await self._context_pool.get()
+    
+    def _release_context(self, context: BrowserContext):
+        """Return a context taken with _acquire_context to the pool."""
+        self._context_pool.put_nowait(context)
     
     async def close(self):
-        """Close browser."""
+        """Save the session, close contexts and the browser."""
+        if self._discovery_context:
+            if self.storage_state_path:
+                try:
+                    ensure_dir(os.path.dirname(self.storage_state_path))
+                    await self._discovery_context.storage_state(path=self.storage_state_path)
+                except Exception as e:
+                    self.logger.warning(f"Could not save storage state: {e}")
+            await self._discovery_context.close()
+            self._discovery_context = None
+        while self._context_pool and not self._context_pool.empty():
+            await self._context_pool.get_nowait().close()
+        self._context_pool = None
         if self.browser:
             await self.browser.close()
+        if self.playwright:
+            await self.playwright.stop()
     
-    async def get_states(self) -> List[str]:
+    async def _wait_for(self, locator: Locator, state: str = "visible", timeout: float = 10000) -> bool:
+        """Wait for locator to reach state; return False (instead of raising) on timeout."""
+        try:
+            await locator.wait_for(state=state, timeout=timeout)
+            return True
+        except PlaywrightTimeoutError:
+            return False
+    
+    async def _wait_menu(self, page: Page, timeout: float = 3000) -> bool:
+        """Wait for an opened dropdown's options to render (returns as soon as the first shows)."""
+        return await self._wait_for(page.locator(self.OPTION_SELECTOR).first, timeout=timeout)
+    
+    async def _read_options(self, page: Page, menu_selector: str = 'div[role="listbox"]') -> Optional[List[Dict[str, Any]]]:
+        """Read [{text, value}] of every option in the open dropdown menu in one round-trip (None if no menu)."""
+        return await page.evaluate('''(menuSelector) => {
+            const menu = document.querySelector(menuSelector);
+            if (!menu) return null;
+            return Array.from(menu.querySelectorAll('div[role="option"]'))
+                .map(o => ({text: o.innerText.trim(), value: o.getAttribute('data-value')}));
+        }''', menu_selector)
+    
+    async def _select_react(
+        self,
+        page: Page,
+        dropdown_index: int,
+        label: str,
+        hidden_input_name: Optional[str] = None,
+        value: Optional[str] = None,
+        settled: Optional[Locator] = None
+    ) -> bool:
+        """
+        Select label in the dropdown_index-th React Select on page.
+        If the option's value and hidden input are known, the value is set directly and
+        settled (an element that appears once the selection takes effect) is awaited;
+        otherwise, or if that doesn't take, the option is clicked in the opened menu.
+        """
+        if hidden_input_name and value:
+            applied = await page.evaluate(self.REACT_SET_VALUE_JS, {"name": hidden_input_name, "value": value})
+            if applied and (settled is None or await self._wait_for(settled)):
+                return True
+            self.logger.debug(f"Setting {hidden_input_name}={value} didn't take, selecting {label} from the menu")
+        
+        dropdown = page.locator(self.SELECT_CONTROL_SELECTOR).nth(dropdown_index)
+        if not await self._wait_for(dropdown):
+            return False
+        await dropdown.click()
+        await self._wait_menu(page)
+        
+        for index, option in enumerate(await self._read_options(page) or []):
+            if option['text'] == label:
+                await page.locator(self.OPTION_SELECTOR).nth(index).click()
+                if settled is not None:
+                    await self._wait_for(settled)
+                return True
+        
+        await page.keyboard.press('Escape')
+        return False
+    
+    async def _goto(self, page: Page, url: str):
+        """Navigate the page to url, respecting the rate limit; timeouts are retried NAVIGATION_RETRIES times."""
+        for attempt in range(self.NAVIGATION_RETRIES + 1):
+            await self.rate_limiter.acquire()
+            try:
+                return await page.goto(url, wait_until="domcontentloaded", timeout=self.NAVIGATION_TIMEOUT)
+            except PlaywrightTimeoutError:
+                if attempt == self.NAVIGATION_RETRIES:
+                    raise
+                self.logger.warning(f"Timed out loading {url}, retrying ({attempt + 1}/{self.NAVIGATION_RETRIES})")
+    
+    async def get_states(self, page: Page) -> List[str]:
         """Extract all state names from React Select dropdown."""
+        if self._states_cache is not None:
+            return self._states_cache
+        
         try:
-            await self.page.goto(self.SIR_URL, wait_until="networkidle", timeout=60000)
-            await asyncio.sleep(3)  # Wait for page to load
+            await self._goto(page, self.SIR_URL)
+            await self._wait_for(page.locator(self.SELECT_CONTROL_SELECTOR).first)  # Wait for the state dropdown to render
             
             # Find the state dropdown React Select
-            state_dropdown = await self.page.query_selector('div.css-13cymwt-control')
-            if not state_dropdown:
+            state_dropdown = page.locator(self.SELECT_CONTROL_SELECTOR).first
+            if not await state_dropdown.count():
                 self.logger.error("Could not find state React Select dropdown")
                 return []
             
             # Click to open the dropdown
             await state_dropdown.click()
-            await asyncio.sleep(2)  # Wait for dropdown menu to appear
+            await self._wait_menu(page)
             
-            # Find the menu
-            menu = None
-            for attempt in range(5):
-                menu = await self.page.query_selector('div[role="listbox"]:visible')
-                if menu and await menu.is_visible():
-                    break
-                await asyncio.sleep(0.5)
+            # Read all options from the menu
+            options = await self._read_options(page)
             
-            if not menu:
+            if options is None:
                 self.logger.error("Could not find state dropdown menu after opening")
-                await self.page.keyboard.press('Escape')
+                await page.keyboard.press('Escape')
                 return []
             
-            # Get all option elements
-            options = await menu.query_selector_all('div[role="option"]')
-            states = []
+            # Skip placeholder/empty options
+            states = [
+                option['text'] for option in options
+                if option['text'] and option['text'].lower() not in self.STATE_PLACEHOLDERS
+            ]
             
-            for option in options:
-                try:
-                    text = await option.inner_text()
-                    if text and text.strip():
-                        text_clean = text.strip()
-                        # Skip placeholder/empty options
-                        if text_clean.lower() not in ['select state', 'select', 'choose state', '--select--', '']:
-                            states.append(text_clean)
-                except Exception:
-                    continue
+            # Remember state codes exposed as data-value, so _get_state_code needn't reopen the menu
+            self._state_code_cache.update(
+                (option['text'], option['value']) for option in options if option['value']
+            )
             
             # Close the dropdown
-            await self.page.keyboard.press('Escape')
-            await asyncio.sleep(0.5)
+            await page.keyboard.press('Escape')
             
             self.logger.info(f"Found {len(states)} states")
+            if states:
+                self._states_cache = states
             return states
         
         except Exception as e:
             self.logger.error(f"Error getting states: {e}")
-            import traceback
             self.logger.debug(traceback.format_exc())
             return []
     
-    async def _get_state_code(self, state_name: str) -> Optional[str]:
+    async def _get_state_code(self, page: Page, state_name: str) -> Optional[str]:
         """Get state code (e.g., S06 for Gujarat)."""
-        # State code mapping (can be expanded)
-        state_codes = {
-            "Gujarat": "S06",
-        }
-        # First check if we have it in our mapping
-        if state_name in state_codes:
-            return state_codes[state_name]
+        # First check if we already know it
+        if state_name in self._state_code_cache:
+            return self._state_code_cache[state_name]
         
         # Otherwise, try to get it from the page
         try:
             # Open state dropdown
-            state_dropdown = await self.page.query_selector('div.css-13cymwt-control')
-            if not state_dropdown:
+            state_dropdown = page.locator(self.SELECT_CONTROL_SELECTOR).first
+            if not await state_dropdown.count():
                 return None
             
             await state_dropdown.click()
-            await asyncio.sleep(2)
+            await self._wait_menu(page)
             
-            # Find menu
-            menu = await self.page.query_selector('div[role="listbox"]:visible')
-            if not menu:
-                await self.page.keyboard.press('Escape')
+            # Read menu options
+            options = await self._read_options(page)
+            if options is None:
+                await page.keyboard.press('Escape')
                 return None
             
             # Find the option matching the state name
-            options = await menu.query_selector_all('div[role="option"]')
-            for option in options:
-                text = await option.inner_text()
-                if text.strip() == state_name:
-                    # Get the data-value attribute
-                    data_value = await option.get_attribute('data-value')
-                    if data_value:
-                        await self.page.keyboard.press('Escape')
-                        return data_value
+            for index, option in enumerate(options):
+                if option['text'] == state_name:
+                    # Use the data-value attribute if present
+                    if option['value']:
+                        await page.keyboard.press('Escape')
+                        self._state_code_cache[state_name] = option['value']
+                        return option['value']
                     
                     # Click the option to select it, then read the hidden input
-                    await option.click()
-                    await asyncio.sleep(1)
+                    await page.locator(self.OPTION_SELECTOR).nth(index).click()
+                    hidden_input = page.locator(f'input[name="{self.STATE_INPUT_NAME}"]').first
                     
                     # Read the hidden input value
-                    hidden_input = await self.page.query_selector('input[name="stateCd"]')
-                    if hidden_input:
+                    if await self._wait_for(hidden_input, state="attached"):
                         value = await hidden_input.get_attribute('value')
-                        await self.page.keyboard.press('Escape')
+                        await page.keyboard.press('Escape')
+                        if value:
+                            self._state_code_cache[state_name] = value
                         return value
             
-            await self.page.keyboard.press('Escape')
+            await page.keyboard.press('Escape')
             return None
         except Exception as e:
             self.logger.debug(f"Error getting state code: {e}")
             return None
     
-    async def get_assemblies(self, state: str) -> List[str]:
+    async def get_assemblies(self, page: Page, state: str) -> List[str]:
         """Get assembly names for a given state using React Select."""
         try:
-            # Get state code first (e.g., S06 for Gujarat)
-            state_code = await self._get_state_code(state)
+            # Get state code first (e.g., S06 for Gujarat) so the state can be set without clicking
+            state_code = await self._get_state_code(page, state)
             if not state_code:
-                self.logger.warning(f"Could not get state code for {state}, trying direct selection")
-                # Fallback to direct selection
-                state_code = None
-            
-            # Method 1: Set hidden input directly if we have the code
-            if state_code:
-                try:
-                    # Use JavaScript to set the value and trigger React Select update
-                    await self.page.evaluate(f'''
-                        () => {{
-                            const hiddenInput = document.querySelector('input[name="stateCd"]');
-                            if (hiddenInput) {{
-                                hiddenInput.value = '{state_code}';
-                                hiddenInput.dispatchEvent(new Event('change', {{ bubbles: true }}));
-                                hiddenInput.dispatchEvent(new Event('input', {{ bubbles: true }}));
-                            }}
-                            // Also try to trigger React Select directly
-                            const reactSelect = document.querySelector('div.css-13cymwt-control');
-                            if (reactSelect) {{
-                                reactSelect.click();
-                            }}
-                        }}
-                    ''')
-                    await asyncio.sleep(2)  # Wait for assembly dropdown to load
-                    self.logger.debug(f"Set state code {state_code} for {state}")
-                except Exception as e:
-                    self.logger.debug(f"Error setting hidden input: {e}")
-                    state_code = None
+                self.logger.warning(f"Could not get state code for {state}, selecting it from the menu")
             
-            # Method 2: If setting hidden input didn't work, try selecting via dropdown
-            if not state_code:
-                state_dropdown = await self.page.query_selector('div.css-13cymwt-control')
-                if not state_dropdown:
-                    self.logger.error(f"Could not find state dropdown to select {state}")
-                    return []
-                
-                await state_dropdown.click()
-                await asyncio.sleep(2)
-                
-                menu = await self.page.query_selector('div[role="listbox"]:visible')
-                if menu:
-                    options = await menu.query_selector_all('div[role="option"]')
-                    found = False
-                    for option in options:
-                        text = await option.inner_text()
-                        if text.strip() == state:
-                            try:
-                                await option.click()
-                                found = True
-                                await asyncio.sleep(2)
-                                break
-                            except:
-                                try:
-                                    await option.evaluate('el => el.click()')
-                                    found = True
-                                    await asyncio.sleep(2)
-                                    break
-                                except:
-                                    continue
-                    
-                    if not found:
-                        self.logger.warning(f"Could not find state option: {state}")
-                        await self.page.keyboard.press('Escape')
-                        return []
-                else:
-                    self.logger.error("Could not find state dropdown menu")
-                    await self.page.keyboard.press('Escape')
-                    return []
+            assembly_control = page.locator(self.SELECT_CONTROL_SELECTOR).nth(1)
+            if not await self._select_react(page, 0, state, self.STATE_INPUT_NAME, state_code, settled=assembly_control):
+                self.logger.warning(f"Could not find state option: {state}")
+                return []
             
             # Now find the assembly dropdown (should be the second React Select)
-            assembly_dropdowns = await self.page.query_selector_all('div.css-13cymwt-control')
-            if len(assembly_dropdowns) < 2:
+            if await page.locator(self.SELECT_CONTROL_SELECTOR).count() < 2:
                 self.logger.warning(f"Could not find assembly dropdown for {state}")
                 return []
             
-            # The second React Select should be the assembly dropdown
-            assembly_dropdown = assembly_dropdowns[1]
-            
             # Click to open assembly dropdown
-            await assembly_dropdown.click()
-            await asyncio.sleep(1)
+            await assembly_control.click()
+            await self._wait_menu(page)
             
             # Get assembly options
-            menu = await self.page.query_selector('div[role="listbox"], div[class*="menu"]')
-            if not menu:
+            options = await self._read_options(page, 'div[role="listbox"], div[class*="menu"]')
+            if options is None:
                 self.logger.warning(f"Could not find assembly dropdown menu for {state}")
                 return []
             
-            options = await menu.query_selector_all('div[role="option"]')
-            assemblies = []
-            for option in options:
-                text = await option.inner_text()
-                if text and text.strip():
-                    text_clean = text.strip()
-                    # Skip placeholder options
-                    if text_clean.lower() not in ['select assembly', 'select', 'choose assembly', '--select--', '']:
-                        assemblies.append(text_clean)
+            # Skip placeholder options
+            assemblies = [
+                option['text'] for option in options
+                if option['text'] and option['text'].lower() not in self.ASSEMBLY_PLACEHOLDERS
+            ]
             
             # Close dropdown
-            await self.page.keyboard.press('Escape')
-            await asyncio.sleep(0.5)
+            await page.keyboard.press('Escape')
             
             return assemblies
         
         except Exception as e:
             self.logger.error(f"Error getting assemblies for {state}: {e}")
-            import traceback
             self.logger.debug(traceback.format_exc())
             return []
     
-    async def get_download_urls_direct(self, state: str, url: str) -> List[Dict[str, str]]:
+    async def get_download_urls_static(self, state: str, url: str) -> List[Dict[str, str]]:
+        """
+        Get all download URLs from a direct state URL with a plain HTTP fetch (no browser).
+        Returns [] if the fetch fails or the HTML has no download links (e.g. a JS-rendered page).
+        """
+        try:
+            await self.rate_limiter.acquire()
+            timeout = aiohttp.ClientTimeout(total=30)
+            async with aiohttp.ClientSession(timeout=timeout) as session:
+                async with session.get(url) as response:
+                    response.raise_for_status()
+                    html = await response.text(errors='replace')
+                    base_url = str(response.url)  # After redirects
+            
+            parser = _DirectLinkParser(base_url)
+            parser.feed(html)
+            parser.close()
+            
+            urls = self._direct_links_to_urls(state, parser.links)
+            if urls:
+                self.logger.info(f"Found {len(urls)} download URLs for {state} (static HTML)")
+            return urls
+        
+        except Exception as e:
+            self.logger.debug(f"Static fetch of {url} failed: {e}")
+            return []
+    
+    async def get_download_urls_direct(self, page: Page, state: str, url: str) -> List[Dict[str, str]]:
         """Get all download URLs from a direct state URL (bypassing React Select)."""
         try:
             self.logger.info(f"Navigating to direct URL for {state}: {url}")
-            await self.page.goto(url, wait_until="networkidle", timeout=60000)
-            await asyncio.sleep(3)  # Wait for page to load
-            
-            # Find all download links (ZIP files, PDFs, etc.)
-            # Try multiple selectors for different link types
-            link_selectors = [
-                'a[href*=".zip"]',
-                'a[href*=".ZIP"]',
-                'a[href*=".pdf"]',
-                'a[href*=".PDF"]',
-                'a[href*="download"]',
-                'a[href*="Download"]',
-            ]
+            await self._goto(page, url)
+            await self._wait_for(page.locator('a[href]').first, state="attached", timeout=self.NAVIGATION_TIMEOUT)  # Wait for the link table
             
-            all_links = []
-            for selector in link_selectors:
-                links = await self.page.query_selector_all(selector)
-                for link in links:
-                    href = await link.get_attribute('href')
-                    if not href:
-                        continue
-                    
-                    # Make absolute URL if relative
-                    if href.startswith('/'):
-                        # Relative to domain
-                        from urllib.parse import urlparse
-                        parsed = urlparse(url)
-                        href = f"{parsed.scheme}://{parsed.netloc}{href}"
-                    elif not href.startswith('http'):
-                        # Relative to current path
-                        from urllib.parse import urljoin
-                        href = urljoin(url, href)
-                    
-                    # Extract assembly name from adjacent table cell
-                    assembly_name = "Unknown"
-                    try:
-                        # Find the parent table row
-                        row = await link.evaluate_handle('el => el.closest("tr")')
-                        if row:
-                            # Get all cells in the row
-                            cells = await row.as_element().query_selector_all('td')
-                            
-                            # Find which cell contains the link
-                            link_cell_index = -1
-                            for i, cell in enumerate(cells):
-                                cell_links = await cell.query_selector_all('a')
-                                for cell_link in cell_links:
-                                    cell_href = await cell_link.get_attribute('href')
-                                    if cell_href == href or (href.endswith(cell_href) if cell_href else False):
-                                        link_cell_index = i
-                                        break
-                                if link_cell_index >= 0:
-                                    break
-                            
-                            # Get assembly name from adjacent cell (usually the first or second cell)
-                            # Try different positions: first cell, second cell, or cell before link
-                            for cell_index in [0, 1, link_cell_index - 1]:
-                                if 0 <= cell_index < len(cells):
-                                    cell_text = await cells[cell_index].inner_text()
-                                    cell_text = cell_text.strip()
-                                    # Skip if it's the link text or empty/download text
-                                    if (cell_text and 
-                                        len(cell_text) > 2 and 
-                                        cell_text.lower() not in ['download', 'click here', '', 'link'] and
-                                        not cell_text.endswith('.zip') and
-                                        not cell_text.endswith('.pdf')):
-                                        assembly_name = cell_text
-                                        break
-                    except Exception as e:
-                        self.logger.debug(f"Error extracting assembly name: {e}")
-                        # Fallback: try to get from link text
-                        text = await link.inner_text()
-                        if text and text.strip() and text.strip().lower() not in ['download', 'click here']:
-                            assembly_name = text.strip()
-                    
-                    all_links.append({
-                        "state": state,
-                        "assembly": assembly_name,
-                        "url": href,
-                        "filename": href.split('/')[-1] if '/' in href else href
-                    })
-            
-            # Remove duplicates
-            seen = set()
-            unique_links = []
-            for link in all_links:
-                url_key = link['url']
-                if url_key not in seen:
-                    seen.add(url_key)
-                    unique_links.append(link)
+            # Read every download link with its table row in one round-trip; the "i"
+            # selector flag matches .zip/.ZIP, .pdf/.PDF and download/Download alike.
+            # a.href is already resolved against the page URL.
+            links = await page.evaluate(self.DIRECT_LINKS_JS)
+            
+            unique_links = self._direct_links_to_urls(state, links)
             
             self.logger.info(f"Found {len(unique_links)} download URLs for {state}")
             return unique_links
         
         except Exception as e:
             self.logger.error(f"Error getting download URLs from direct URL for {state}: {e}")
-            import traceback
             self.logger.debug(traceback.format_exc())
             return []
     
-    async def get_download_urls(self, state: str, assembly: str) -> List[Dict[str, str]]:
+    def _direct_links_to_urls(self, state: str, links: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+        """Turn direct-page link records into URL metadata, one per URL (first occurrence wins)."""
+        links_by_url: Dict[str, Dict[str, str]] = {}
+        for link in links:
+            href = link['href']
+            if href in links_by_url:
+                continue
+            
+            # Assembly name from a cell of the link's row: first cell, second cell,
+            # or the cell before the link, skipping link/download texts
+            cells = link['cells']
+            assembly_name = "Unknown"
+            if cells:
+                for cell_index in [0, 1, link['linkCell'] - 1]:
+                    if 0 <= cell_index < len(cells):
+                        cell_text = cells[cell_index]
+                        if (len(cell_text) > 2 and
+                            cell_text.lower() not in self.NON_ASSEMBLY_TEXTS and
+                            not cell_text.endswith(self.DOWNLOAD_EXTENSIONS)):
+                            assembly_name = cell_text
+                            break
+            elif link['text'].lower() not in self.NON_ASSEMBLY_TEXTS:
+                # Not in a table row: fall back to the link text
+                assembly_name = link['text']
+            
+            links_by_url[href] = {
+                "state": state,
+                "assembly": assembly_name,
+                "url": href,
+                "filename": href.split('/')[-1] if '/' in href else href
+            }
+        
+        return list(links_by_url.values())
+    
+    async def get_download_urls(self, page: Page, state: str, assembly: str) -> List[Dict[str, str]]:
         """Get all ZIP download URLs for a state-assembly combination using React Select."""
+        if not await self._select_state_on_page(page, state):
+            return []
+        return await self._get_urls_for_assembly(page, state, assembly) or []
+    
+    async def _select_state_on_page(self, page: Page, state: str) -> bool:
+        """Load the portal on page and select state, leaving the assembly dropdown ready."""
         try:
             # Navigate to the page
-            await self.page.goto(self.SIR_URL, wait_until="networkidle", timeout=60000)
-            await asyncio.sleep(3)
-            
-            # Select state from React Select
-            state_dropdowns = await self.page.query_selector_all('div.css-13cymwt-control')
-            if not state_dropdowns:
-                self.logger.error("Could not find state dropdown")
-                return []
+            await self._goto(page, self.SIR_URL)
+            await self._wait_for(page.locator(self.SELECT_CONTROL_SELECTOR).first)
             
-            state_dropdown = state_dropdowns[0]
-            await state_dropdown.click()
-            await asyncio.sleep(2)  # Wait for dropdown menu to appear
-            
-            # Find and click state option - wait for menu to appear
-            menu = None
-            for attempt in range(5):
-                menu = await self.page.query_selector('div[role="listbox"]:visible')
-                if menu and await menu.is_visible():
-                    break
-                await asyncio.sleep(0.5)
-            
-            if menu:
-                options = await menu.query_selector_all('div[role="option"]')
-                found = False
-                
-                # Try clicking first
-                for option in options:
-                    try:
-                        text = await option.inner_text()
-                        if text.strip() == state:
-                            await option.scroll_into_view_if_needed()
-                            await asyncio.sleep(0.3)
-                            
-                            try:
-                                await option.click()
-                                found = True
-                                await asyncio.sleep(2)  # Wait for assembly dropdown to load
-                                break
-                            except:
-                                try:
-                                    await option.evaluate('el => el.click()')
-                                    found = True
-                                    await asyncio.sleep(2)
-                                    break
-                                except Exception as e:
-                                    self.logger.debug(f"Error clicking state option: {e}")
-                                    continue
-                    except Exception as e:
-                        self.logger.debug(f"Error processing state option: {e}")
-                        continue
-                
-                # Fallback to keyboard navigation
-                if not found:
-                    self.logger.debug("Trying keyboard navigation for state selection")
-                    try:
-                        # Find the input field in the React Select
-                        input_field = await self.page.query_selector('input[id*="react-select"], input[role="combobox"]')
-                        if input_field:
-                            await input_field.click()
-                            await asyncio.sleep(0.3)
-                            await input_field.fill('')
-                            await asyncio.sleep(0.2)
-                            await input_field.type(state, delay=30)
-                            await asyncio.sleep(1)
-                            await self.page.keyboard.press('Enter')
-                            await asyncio.sleep(2)
-                            found = True
-                        else:
-                            await self.page.keyboard.type(state, delay=30)
-                            await asyncio.sleep(1)
-                            await self.page.keyboard.press('Enter')
-                            await asyncio.sleep(2)
-                            found = True
-                    except Exception as e:
-                        self.logger.debug(f"Keyboard navigation failed: {e}")
-                
-                if not found:
-                    self.logger.error(f"Could not find state option: {state}")
-                    await self.page.keyboard.press('Escape')
-                    return []
-            else:
-                self.logger.error("Could not find state dropdown menu")
-                await self.page.keyboard.press('Escape')
-                return []
+            # Select state from React Select (via the hidden input when the code is known)
+            state_code = await self._get_state_code(page, state)
+            assembly_control = page.locator(self.SELECT_CONTROL_SELECTOR).nth(1)
+            if not await self._select_react(page, 0, state, self.STATE_INPUT_NAME, state_code, settled=assembly_control):
+                self.logger.error(f"Could not find state option: {state}")
+                return False
             
+            return True
+        
+        except Exception as e:
+            self.logger.error(f"Error selecting state {state}: {e}")
+            self.logger.debug(traceback.format_exc())
+            return False
+    
+    async def _get_urls_for_assembly(self, page: Page, state: str, assembly: str) -> Optional[List[Dict[str, str]]]:
+        """
+        Select assembly on a page where state is already selected, submit, and collect ZIP URLs.
+        Returns None if the page has no assembly dropdown (state needs to be selected again).
+        """
+        try:
             # Select assembly from React Select (second dropdown)
-            assembly_dropdowns = await self.page.query_selector_all('div.css-13cymwt-control')
-            if len(assembly_dropdowns) < 2:
+            if await page.locator(self.SELECT_CONTROL_SELECTOR).count() < 2:
                 self.logger.error("Could not find assembly dropdown")
-                return []
+                return None
             
-            assembly_dropdown = assembly_dropdowns[1]
-            await assembly_dropdown.click()
-            await asyncio.sleep(2)  # Wait for dropdown menu to appear
-            
-            # Find and click assembly option - wait for menu to appear
-            menu = None
-            for attempt in range(5):
-                menu = await self.page.query_selector('div[role="listbox"]:visible')
-                if menu and await menu.is_visible():
-                    break
-                await asyncio.sleep(0.5)
-            
-            if menu:
-                options = await menu.query_selector_all('div[role="option"]')
-                found = False
-                
-                # Try clicking first
-                for option in options:
-                    try:
-                        text = await option.inner_text()
-                        if text.strip() == assembly:
-                            await option.scroll_into_view_if_needed()
-                            await asyncio.sleep(0.3)
-                            try:
-                                await option.click()
-                                found = True
-                                await asyncio.sleep(2)
-                                break
-                            except:
-                                try:
-                                    await option.evaluate('el => el.click()')
-                                    found = True
-                                    await asyncio.sleep(2)
-                                    break
-                                except Exception as e:
-                                    self.logger.debug(f"Error clicking assembly option: {e}")
-                                    continue
-                    except Exception as e:
-                        self.logger.debug(f"Error processing assembly option: {e}")
-                        continue
-                
-                # Fallback to keyboard navigation
-                if not found:
-                    self.logger.debug("Trying keyboard navigation for assembly selection")
-                    try:
-                        input_field = await self.page.query_selector('input[id*="react-select"], input[role="combobox"]')
-                        if input_field:
-                            await input_field.click()
-                            await asyncio.sleep(0.3)
-                            await input_field.fill('')
-                            await asyncio.sleep(0.2)
-                            await input_field.type(assembly, delay=30)
-                            await asyncio.sleep(1)
-                            await self.page.keyboard.press('Enter')
-                            await asyncio.sleep(2)
-                            found = True
-                        else:
-                            await self.page.keyboard.type(assembly, delay=30)
-                            await asyncio.sleep(1)
-                            await self.page.keyboard.press('Enter')
-                            await asyncio.sleep(2)
-                            found = True
-                    except Exception as e:
-                        self.logger.debug(f"Keyboard navigation failed: {e}")
-                
-                if not found:
-                    self.logger.error(f"Could not find assembly option: {assembly}")
-                    await self.page.keyboard.press('Escape')
-                    return []
-            else:
-                self.logger.error("Could not find assembly dropdown menu")
-                await self.page.keyboard.press('Escape')
+            if not await self._select_react(page, 1, assembly):
+                self.logger.error(f"Could not find assembly option: {assembly}")
                 return []
             
+            # Links currently shown (from the previous assembly, on a reused page)
+            previous_links = await page.evaluate(self.ZIP_HREFS_JS)
+            
             # Click submit/search button
-            submit_button = await self.page.query_selector(
+            submit_button = page.locator(
                 'button[type="submit"], input[type="submit"], button:has-text("Search"), button:has-text("Download"), button:has-text("Submit")'
-            )
-            if submit_button:
+            ).first
+            if await submit_button.count():
                 await submit_button.click()
-                await asyncio.sleep(5)  # Wait for results to load
             else:
                 # Try pressing Enter or finding any button
-                await self.page.keyboard.press('Enter')
-                await asyncio.sleep(5)
-            
-            # Find all download links (ZIP files)
-            links = await self.page.query_selector_all('a[href*=".zip"], a[href*=".ZIP"]')
-            urls = []
-            
-            for link in links:
-                href = await link.get_attribute('href')
-                text = await link.inner_text()
-                if href:
-                    # Make absolute URL if relative
-                    if href.startswith('/'):
-                        href = f"https://voters.eci.gov.in{href}"
-                    elif not href.startswith('http'):
-                        href = f"{self.SIR_URL.rsplit('/', 1)[0]}/{href}"
-                    
-                    urls.append({
-                        "state": state,
-                        "assembly": assembly,
-                        "url": href,
-                        "filename": text.strip() if text else href.split('/')[-1]
-                    })
+                await page.keyboard.press('Enter')
+            
+            # Wait for results to load: links present and different from the previous ones
+            try:
+                await page.wait_for_function(
+                    f"(previous) => {{ const links = ({self.ZIP_HREFS_JS})(); return links && links !== previous; }}",
+                    arg=previous_links,
+                    timeout=30000
+                )
+            except PlaywrightTimeoutError:
+                pass
+            
+            # Find all download links (ZIP files) in one round-trip, already absolute
+            links = await page.evaluate(self.ZIP_LINKS_JS)
+            urls = [
+                {
+                    "state": state,
+                    "assembly": assembly,
+                    "url": link['href'],
+                    "filename": link['text'] or link['href'].split('/')[-1]
+                }
+                for link in links
+            ]
             
             self.logger.info(f"Found {len(urls)} download URLs for {state}/{assembly}")
             return urls
         
         except Exception as e:
             self.logger.error(f"Error getting download URLs for {state}/{assembly}: {e}")
-            import traceback
             self.logger.debug(traceback.format_exc())
             return []
     
-    async def crawl_all(self, state_filter: Optional[str] = None, max_assemblies: Optional[int] = None, use_checkpoint: bool = False) -> Iterator[Dict[str, str]]:
+    async def _open_discovery_page(self) -> Page:
+        """
+        Start the browser and open crawl_all's own page, used for state/assembly discovery;
+        assembly URLs are fetched by up to max_concurrent_pages workers on the pooled contexts.
+        """
+        await self.initialize()
+        self._discovery_context = await self._new_context()
+        return await self._discovery_context.new_page()
+    
+    async def _crawl_worker(
+        self,
+        state: str,
+        assemblies: asyncio.Queue,
+        results: asyncio.Queue
+    ):
+        """
+        Fetch URLs for queued assemblies of one state on a page of a pooled browser context.
+        The state is selected once; the page then stays parked on it and only the
+        assembly dropdown is changed for each following assembly.
+        Reports (assembly, urls), with urls None if the assembly failed or was skipped
+        because the state failed STATE_FAILURE_LIMIT times in a row.
+        """
+        context = None
+        page = None
+        state_selected = False
+        try:
+            while True:
+                try:
+                    assembly = assemblies.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                
+                urls = None
+                if self._state_failures.get(state, 0) >= self.STATE_FAILURE_LIMIT:
+                    await results.put((assembly, None))
+                    continue
+                
+                try:
+                    if context is None:
+                        context = await self._acquire_context()
+                    if page is None:
+                        page = await context.new_page()
+                    if state_selected:
+                        urls = await self._get_urls_for_assembly(page, state, assembly)
+                    if urls is None:
+                        # First assembly on this page, or the page lost the form
+                        state_selected = await self._select_state_on_page(page, state)
+                        if state_selected:
+                            urls = await self._get_urls_for_assembly(page, state, assembly)
+                except Exception as e:
+                    self.logger.error(f"Error crawling {state}/{assembly}: {e}")
+                    state_selected = False
+                finally:
+                    # Always report, so crawl_all gets one result per assembly
+                    await results.put((assembly, urls))
+                
+                if urls is None:
+                    failures = self._state_failures[state] = self._state_failures.get(state, 0) + 1
+                    if failures == self.STATE_FAILURE_LIMIT:
+                        self.logger.error(f"{state} failed {failures} times in a row; skipping its remaining assemblies this run")
+                else:
+                    self._state_failures[state] = 0
+        finally:
+            # The context goes back to the pool for the next state's workers
+            if context:
+                try:
+                    if page:
+                        await page.close()
+                finally:
+                    self._release_context(context)
+    
+    def _load_logged_urls(self, state_filter: Optional[str] = None) -> Dict[Tuple[str, str], List[Dict[str, str]]]:
+        """URLs appended to urls_path by earlier runs, grouped by (state, assembly) (each URL once)."""
+        if not os.path.exists(self.urls_path):
+            return {}
+        by_assembly: Dict[Tuple[str, str], List[Dict[str, str]]] = {}
+        seen_urls = set()
+        with open(self.urls_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    url_data = json.loads(line)
+                except ValueError:
+                    continue  # Line cut short by a crash
+                state = url_data['state']
+                if state_filter and state_filter.lower() not in state.lower():
+                    continue
+                if url_data['url'] in seen_urls:
+                    continue
+                seen_urls.add(url_data['url'])
+                by_assembly.setdefault((state, url_data['assembly']), []).append(url_data)
+        return by_assembly
+    
+    @staticmethod
+    def _ends_with_newline(path: str) -> bool:
+        """Whether a (non-empty) file's last byte is a newline."""
+        with open(path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+    
+    async def crawl_all(self, state_filter: Optional[str] = None, max_assemblies: Optional[int] = None, use_checkpoint: bool = False) -> AsyncIterator[Dict[str, str]]:
+        """Crawl all states and assemblies, yielding download URL metadata one URL at a time."""
+        async with aclosing(self.crawl_batches(state_filter, max_assemblies, use_checkpoint)) as batches:
+            async for _, _, urls in batches:
+                for url_data in urls:
+                    yield url_data
+    
+    async def crawl_batches(
+        self,
+        state_filter: Optional[str] = None,
+        max_assemblies: Optional[int] = None,
+        use_checkpoint: bool = False
+    ) -> AsyncIterator[Tuple[str, str, List[Dict[str, str]]]]:
         """
-        Crawl all states and assemblies, yielding download URL metadata.
-        Supports checkpointing and resume (only if use_checkpoint=True).
+        Crawl all states and assemblies, yielding (state, assembly, urls) once per assembly
+        with URLs, as soon as its URLs are collected.
+        Supports checkpointing and resume (only if use_checkpoint=True): progress is
+        saved per assembly, and each URL is appended to urls_path as it is yielded.
+        On resume the URLs logged by earlier runs are yielded first (an assembly is
+        checkpointed once crawled, not once processed; callers skip what they completed).
         Uses direct URLs when available, otherwise falls back to React Select.
         """
         checkpoint = {}
         processed_states = set()
+        urls_log = None
+        logged: Dict[Tuple[str, str], List[Dict[str, str]]] = {}
         
         if use_checkpoint:
+            logged = self._load_logged_urls(state_filter)
             checkpoint = load_checkpoint(self.checkpoint_path)
             processed_states = set(checkpoint.get('processed_states', []))
+            # Sets in memory (saved as sorted lists)
+            checkpoint['processed_assemblies'] = {
+                state: set(done) for state, done in checkpoint.get('processed_assemblies', {}).items()
+            }
+            ensure_dir(os.path.dirname(self.urls_path))
+            urls_log = open(self.urls_path, 'a', encoding='utf-8', buffering=1)  # Line-buffered
+            if urls_log.tell() and not self._ends_with_newline(self.urls_path):
+                urls_log.write("\n")  # End a line cut short by a crash, so the next one reads back
+        logged_urls = {url_data['url'] for urls in logged.values() for url_data in urls}
         
-        await self.initialize()
+        def log_urls(urls: List[Dict[str, str]]):
+            """Append URLs not logged yet to urls_path (re-crawled assemblies repeat earlier ones)."""
+            if urls_log:
+                new_urls = [url_data for url_data in urls if url_data['url'] not in logged_urls]
+                logged_urls.update(url_data['url'] for url_data in new_urls)
+                urls_log.writelines(json.dumps(url_data, ensure_ascii=False) + "\n" for url_data in new_urls)
         
         try:
+            # Replay what earlier runs found, crawled or not (skipping crawled assemblies below
+            # would otherwise lose those whose pipeline run was interrupted)
+            if logged:
+                self.logger.info(f"Resuming with {sum(map(len, logged.values())):,} URLs from {self.urls_path}")
+            for (state, assembly), urls in logged.items():
+                yield state, assembly, urls
+            
             # Check if we have a direct URL for the filtered state
             if state_filter and state_filter in self.STATE_DIRECT_URLS:
                 direct_url = self.STATE_DIRECT_URLS[state_filter]
@@ -608,11 +823,19 @@ class Crawler:
                     self.logger.info(f"Skipping already processed state: {state_filter}")
                     return
                 
-                # Get all URLs from direct page
-                urls = await self.get_download_urls_direct(state_filter, direct_url)
-                
+                # Get all URLs from direct page (plain HTTP first, the browser only if that
+                # finds nothing), grouped by assembly (first-seen order)
+                urls = await self.get_download_urls_static(state_filter, direct_url)
+                if not urls:
+                    page = await self._open_discovery_page()
+                    urls = await self.get_download_urls_direct(page, state_filter, direct_url)
+                by_assembly: Dict[str, List[Dict[str, str]]] = {}
                 for url_data in urls:
-                    yield url_data
+                    by_assembly.setdefault(url_data['assembly'], []).append(url_data)
+                
+                for assembly, assembly_urls in by_assembly.items():
+                    log_urls(assembly_urls)
+                    yield state_filter, assembly, assembly_urls
                 
                 # Mark state as processed (only if checkpointing enabled)
                 if use_checkpoint:
@@ -621,11 +844,21 @@ class Crawler:
                     save_checkpoint(self.checkpoint_path, checkpoint)
                 return
             
-            # Otherwise, use the React Select approach
-            states = await self.get_states()
-            
-            if state_filter:
-                states = [s for s in states if state_filter.lower() in s.lower()]
+            # Otherwise, use the React Select approach. A filter naming a state whose
+            # code is already known needs no scrape of the state list.
+            page = await self._open_discovery_page()
+            known_state = next(
+                (name for name in self._state_code_cache if state_filter and name.lower() == state_filter.lower()),
+                None
+            )
+            if known_state:
+                states = [known_state]
+                await self._goto(page, self.SIR_URL)
+                await self._wait_for(page.locator(self.SELECT_CONTROL_SELECTOR).first)
+            else:
+                states = await self.get_states(page)
+                if state_filter:
+                    states = [s for s in states if state_filter.lower() in s.lower()]
             
             for state in states:
                 if use_checkpoint and state in processed_states:
@@ -633,30 +866,66 @@ class Crawler:
                     continue
                 
                 self.logger.info(f"Processing state: {state}")
-                assemblies = await self.get_assemblies(state)
+                assemblies = await self.get_assemblies(page, state)
                 
                 if max_assemblies:
                     assemblies = assemblies[:max_assemblies]
                 
-                processed_assemblies = checkpoint.get('processed_assemblies', {}).get(state, []) if use_checkpoint else []
+                processed_assemblies = checkpoint['processed_assemblies'].get(state, set()) if use_checkpoint else set()
                 
+                pending = []
                 for assembly in assemblies:
                     if use_checkpoint and assembly in processed_assemblies:
                         self.logger.info(f"Skipping already processed assembly: {state}/{assembly}")
                         continue
-                    
-                    urls = await self.get_download_urls(state, assembly)
-                    
-                    for url_data in urls:
-                        yield url_data
-                    
-                    # Update checkpoint (only if checkpointing enabled)
-                    if use_checkpoint:
-                        if state not in checkpoint.get('processed_assemblies', {}):
-                            checkpoint['processed_assemblies'][state] = []
-                        checkpoint['processed_assemblies'][state].append(assembly)
+                    pending.append(assembly)
+                
+                # Fetch assemblies concurrently; yield each one's URLs as soon as it finishes
+                # (the workers keep crawling while the consumer handles a batch)
+                assembly_queue: asyncio.Queue = asyncio.Queue()
+                for assembly in pending:
+                    assembly_queue.put_nowait(assembly)
+                results: asyncio.Queue = asyncio.Queue()
+                tasks = [
+                    asyncio.create_task(self._crawl_worker(state, assembly_queue, results))
+                    for _ in range(min(self.max_concurrent_pages, len(pending)))
+                ]
+                unsaved = 0
+                last_saved = time.monotonic()
+                failed = 0
+                try:
+                    for _ in range(len(pending)):
+                        assembly, urls = await results.get()
+                        if urls is None:
+                            failed += 1  # Not checkpointed, so it is retried on resume
+                            continue
+                        
+                        if urls:
+                            log_urls(urls)
+                            yield state, assembly, urls
+                        
+                        # Update checkpoint (only if checkpointing enabled), saving every
+                        # checkpoint_every assemblies or checkpoint_interval seconds rather
+                        # than rewriting it for each one
+                        if use_checkpoint:
+                            checkpoint['processed_assemblies'].setdefault(state, set()).add(assembly)
+                            unsaved += 1
+                            if unsaved >= self.checkpoint_every or time.monotonic() - last_saved >= self.checkpoint_interval:
+                                save_checkpoint(self.checkpoint_path, checkpoint)
+                                unsaved = 0
+                                last_saved = time.monotonic()
+                finally:
+                    # Consumer stopped early (or an error): don't leave pages loading
+                    for task in tasks:
+                        task.cancel()
+                    await asyncio.gather(*tasks, return_exceptions=True)  # Pages closed, contexts back in the pool
+                    if unsaved:
                         save_checkpoint(self.checkpoint_path, checkpoint)
                 
+                if failed:
+                    self.logger.warning(f"{failed} assembly(ies) of {state} failed")
+                    continue
+                
                 # Mark state as processed (only if checkpointing enabled)
                 if use_checkpoint:
                     processed_states.add(state)
@@ -664,5 +933,7 @@ class Crawler:
                     save_checkpoint(self.checkpoint_path, checkpoint)
         
         finally:
+            if urls_log:
+                urls_log.close()
             await self.close()
 
@@ -2,17 +2,35 @@
 Database loader using SQLAlchemy for voter data storage
 """
 
-from sqlalchemy import create_engine, Column, String, Integer, DateTime, Index, UniqueConstraint
+from sqlalchemy import create_engine, event, Column, String, Integer, DateTime, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.exc import IntegrityError
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional
+from contextlib import contextmanager
 from datetime import datetime
 import os
-import uuid
+import sqlite3
+import threading
 
 Base = declarative_base()
 
+# Max bound parameters per statement (raised from 999 in SQLite 3.32)
+SQLITE_MAX_VARIABLES = 32766 if sqlite3.sqlite_version_info >= (3, 32, 0) else 999
+
+
+def _new_ids(count: int) -> List[str]:
+    """
+    Generate count random (version 4) UUID strings from a single os.urandom call,
+    without building a uuid.UUID object per row.
+    """
+    digits = os.urandom(16 * count).hex()
+    return [
+        f"{digits[i:i + 8]}-{digits[i + 8:i + 12]}-4{digits[i + 13:i + 16]}-"
+        f"{'89ab'[int(digits[i + 16], 16) & 3]}{digits[i + 17:i + 20]}-{digits[i + 20:i + 32]}"
+        for i in range(0, 32 * count, 32)
+    ]
+
 
 class Voter(Base):
     """SQLAlchemy model for voter records."""
@@ -34,14 +52,17 @@ class Voter(Base):
     assembly = Column(String, nullable=False)
     source_file = Column(String, nullable=True)
     last_updated = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    
-    # Indexes for fast filtering
-    __table_args__ = (
-        Index('idx_epic_no', 'epic_no'),  # Index on EPIC for lookups (not unique)
-        Index('idx_state', 'state'),
-        Index('idx_assembly', 'assembly'),
-        Index('idx_state_assembly', 'state', 'assembly'),
-    )
+
+
+# Indexes for fast filtering. Not part of the model (create_all skips them): they are built by
+# DBLoader.create_indexes once ingestion is done, rather than maintained on every insert.
+VOTER_INDEXES = {
+    # EPIC lookups (not unique); many records have none, so those rows are left out
+    'idx_epic_no': "CREATE INDEX IF NOT EXISTS idx_epic_no ON voters (epic_no) WHERE epic_no IS NOT NULL",
+    'idx_assembly': "CREATE INDEX IF NOT EXISTS idx_assembly ON voters (assembly)",
+    # Also serves state-only filters (leftmost column)
+    'idx_state_assembly': "CREATE INDEX IF NOT EXISTS idx_state_assembly ON voters (state, assembly)",
+}
 
 
 class DBLoader:
@@ -60,71 +81,153 @@ class DBLoader:
             connect_args={'check_same_thread': False}  # Allow multi-threaded access
         )
         
+        # Tune SQLite for bulk inserts on every new connection
+        event.listen(self.engine, "connect", self._set_sqlite_pragmas)
+        
         # Create tables
         Base.metadata.create_all(self.engine)
         
         # Create session factory
         self.SessionLocal = sessionmaker(bind=self.engine)
+        
+        # SQLite allows one writer at a time; serialize inserts from concurrent constituencies
+        self._write_lock = threading.RLock()
+        self._local = threading.local()  # Session of the active transaction() in this thread
+    
+    @staticmethod
+    def _set_sqlite_pragmas(dbapi_conn, connection_record):
+        """Use WAL journaling with relaxed fsync (one fsync per checkpoint, not per commit)."""
+        cursor = dbapi_conn.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA mmap_size=30000000000")
+        cursor.execute("PRAGMA cache_size=-262144")  # 256 MB page cache (negative = KiB)
+        cursor.execute("PRAGMA busy_timeout=30000")  # Wait for another writer instead of failing with "database is locked"
+        cursor.close()
     
     def get_session(self) -> Session:
         """Get a new database session."""
         return self.SessionLocal()
     
-    def batch_insert(self, records: List[Dict[str, Any]], batch_size: int = 1000) -> tuple[int, int]:
+    @contextmanager
+    def transaction(self) -> Iterator[Session]:
         """
-        Insert records in batches with UPSERT logic.
-        Returns (new_count, updated_count).
+        Run all batch_insert calls made inside the block in a single transaction.
+        Commits once on exit, rolls back everything on error.
         """
-        session = self.get_session()
-        new_count = 0
-        updated_count = 0
-        
-        try:
-            for i in range(0, len(records), batch_size):
-                batch = records[i:i + batch_size]
-                
-                for record in batch:
-                    # Generate unique ID for this record
-                    record_id = str(uuid.uuid4())
-                    
-                    # Prepare voter object
-                    voter = Voter(
-                        id=record_id,
-                        epic_no=record.get('epic_no'),  # Can be None
-                        name_og=record.get('name_og'),
-                        name_en=record.get('name_en'),
-                        relation_type=record.get('relation_type'),
-                        relation_og=record.get('relation_og'),
-                        relation_en=record.get('relation_en'),
-                        age=record.get('age'),
-                        gender=record.get('gender'),
-                        address_og=record.get('address_og'),
-                        address_en=record.get('address_en'),
-                        state=record.get('state'),
-                        assembly=record.get('assembly'),
-                        source_file=record.get('source_file'),
-                        last_updated=datetime.utcnow()
-                    )
-                    
-                    # Always insert as new record (no more UPSERT by EPIC)
-                    # Each record gets a unique ID
-                    session.add(voter)
-                    new_count += 1
-                
-                # Commit batch
+        with self._write_lock:
+            session = self.get_session()
+            self._local.session = session
+            try:
+                yield session
                 session.commit()
+            except Exception:
+                session.rollback()
+                raise
+            finally:
+                self._local.session = None
+                session.close()
+    
+    def insert_many(self, records: List[Dict[str, Any]], session: Session, batch_size: int = 1000) -> int:
+        """
+        Insert records with multi-row INSERT ... VALUES (...), (...) statements.
+        Each statement carries up to batch_size rows (capped by SQLite's parameter limit).
+        Returns number of inserted rows.
+        """
+        # id and last_updated are generated here; every other column comes from the record
+        data_columns = [
+            column.name for column in Voter.__table__.columns
+            if column.name not in ('id', 'last_updated')
+        ]
+        columns = ['id', *data_columns, 'last_updated']
+        rows_per_statement = max(1, min(batch_size, SQLITE_MAX_VARIABLES // len(columns)))
+        row_placeholder = "(" + ",".join("?" * len(columns)) + ")"
+        insert_prefix = f"INSERT INTO {Voter.__tablename__} ({','.join(columns)}) VALUES "
+        # Every full chunk reuses one SQL string (and so sqlite3's cached prepared statement);
+        # only a shorter last chunk needs its own
+        full_statement = insert_prefix + ",".join([row_placeholder] * rows_per_statement)
+        # Same text format SQLAlchemy uses for SQLite DateTime columns
+        now = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S.%f')
+        connection = session.connection()
         
-        except IntegrityError as e:
-            session.rollback()
-            raise Exception(f"Database integrity error: {e}")
-        except Exception as e:
-            session.rollback()
-            raise Exception(f"Database error: {e}")
-        finally:
-            session.close()
+        for i in range(0, len(records), rows_per_statement):
+            batch = records[i:i + rows_per_statement]
+            params = []
+            for record, record_id in zip(batch, _new_ids(len(batch))):
+                params.append(record_id)  # Unique ID for each record
+                # Parsed records only carry the keys that were found (missing → NULL), which rules out
+                # itemgetter; map() over the bound get is the fastest lookup that tolerates them
+                params.extend(map(record.get, data_columns))
+                params.append(now)
+            
+            statement = (
+                full_statement if len(batch) == rows_per_statement
+                else insert_prefix + ",".join([row_placeholder] * len(batch))
+            )
+            connection.exec_driver_sql(statement, tuple(params))
+        
+        return len(records)
+    
+    def batch_insert(
+        self,
+        records: List[Dict[str, Any]],
+        batch_size: int = 1000,
+        commit_every: int = 100_000
+    ) -> tuple[int, int]:
+        """
+        Insert records in batches (every record is a new row with its own ID).
+        Outside transaction() all batches share one transaction, committed every
+        commit_every rows to keep the WAL file bounded; inside it, the block commits.
+        Returns (new_count, updated_count).
+        """
+        with self._write_lock:
+            active_session = getattr(self._local, 'session', None)
+            session = active_session or self.get_session()
+            updated_count = 0
+            
+            try:
+                if active_session:
+                    # transaction() commits once on exit
+                    new_count = self.insert_many(records, session, batch_size=batch_size)
+                else:
+                    new_count = 0
+                    step = max(1, commit_every)
+                    for i in range(0, len(records), step):
+                        new_count += self.insert_many(records[i:i + step], session, batch_size=batch_size)
+                        session.commit()
+            
+            except IntegrityError as e:
+                session.rollback()
+                raise Exception(f"Database integrity error: {e}")
+            except Exception as e:
+                session.rollback()
+                raise Exception(f"Database error: {e}")
+            finally:
+                if not active_session:
+                    session.close()
         
         return new_count, updated_count
     
+    def delete_assembly(self, state: str, assembly: str) -> int:
+        """Delete all records of an assembly (e.g. partly stored by an interrupted run). Returns rows deleted."""
+        with self._write_lock, self.engine.begin() as connection:
+            result = connection.exec_driver_sql(
+                f"DELETE FROM {Voter.__tablename__} WHERE state = ? AND assembly = ?",
+                (state, assembly)
+            )
+            return result.rowcount
+    
+    def create_indexes(self):
+        """
+        Create the secondary indexes (VOTER_INDEXES) that don't exist yet.
+        Called once ingestion is finished; building an index in one pass is much
+        cheaper than updating it for every inserted row.
+        """
+        with self._write_lock, self.engine.begin() as connection:
+            for statement in VOTER_INDEXES.values():
+                connection.exec_driver_sql(statement)
+    
     def get_stats(self) -> Dict[str, int]:
         """Get database statistics."""
         session = self.get_session()
@@ -3,16 +3,54 @@ Async downloader for ZIP files using aiohttp
 """
 
 import aiohttp
-import aiofiles
 import asyncio
+import hashlib
+import os
+from aiolimiter import AsyncLimiter
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from urllib.parse import urlparse
 
+from .extractor import EXTRACTED_SUFFIX
 from .utils import ensure_dir, sanitize_filename, format_size
 from .logger import Logger
 
 
+# HTTP statuses worth retrying (rate limited / temporarily unavailable)
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Digest size (bytes) of the blake2b content fingerprints
+DIGEST_SIZE = 16
+
+# Suffix of the empty marker written in place of a file whose content was already downloaded
+DUPLICATE_SUFFIX = '.duplicate'
+
+# Suffix of a file still being downloaded; renamed to the real name once complete
+PARTIAL_SUFFIX = '.part'
+
+
+def _write_all(fd: int, data: bytes):
+    """Write all of data to a file descriptor (os.write may write only part of it)."""
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+
+def _file_size(path: Path) -> Optional[int]:
+    """Size of a file in bytes, or None if it doesn't exist (a single stat call)."""
+    try:
+        return path.stat().st_size
+    except FileNotFoundError:
+        return None
+
+
+def _hash_file(hasher, path: Path):
+    """Feed the contents of a file to a hashlib object."""
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            hasher.update(block)
+
+
 class Downloader:
     """Async batch downloader with retry logic."""
     
@@ -20,14 +58,51 @@ class Downloader:
         self,
         logger: Logger,
         base_dir: str = "data/voterlists",
-        max_concurrent: int = 1,
-        max_retries: int = 3
+        max_concurrent: int = 10,
+        max_retries: int = 3,
+        requests_per_second: float = 10.0,
+        digest_file: str = "data/checkpoints/content_digests.tsv"
     ):
         self.logger = logger
         self.base_dir = base_dir
         self.max_concurrent = max_concurrent
         self.max_retries = max_retries
-        self.semaphore = asyncio.Semaphore(max_concurrent)
+        self.semaphore = asyncio.Semaphore(max_concurrent)  # In-flight downloads
+        self.rate_limiter = AsyncLimiter(requests_per_second, 1.0)  # Requests started per second
+        
+        # Digest → path of every downloaded file, so byte-identical files behind
+        # different URLs are only extracted and parsed once
+        self.digest_file = Path(digest_file)
+        self.seen_digests = self._load_digests()
+    
+    def _load_digests(self) -> Dict[str, str]:
+        """Load content digests recorded by previous runs (one "digest<TAB>path" per line)."""
+        if not self.digest_file.exists():
+            return {}
+        seen = {}
+        with open(self.digest_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                digest, _, path = line.rstrip('\n').partition('\t')
+                if path:
+                    seen[digest] = path  # Latest record wins
+        return seen
+    
+    def _find_duplicate(self, digest: str, filepath: Path) -> Optional[str]:
+        """
+        Return the path of another file with the same content digest that is still on
+        disk, or was extracted (and so removed) by the Extractor; else record this one.
+        """
+        original = self.seen_digests.get(digest)
+        if original and original != str(filepath) and (
+            Path(original).exists() or Path(original + EXTRACTED_SUFFIX).exists()
+        ):
+            return original
+        if original != str(filepath):
+            self.seen_digests[digest] = str(filepath)
+            ensure_dir(self.digest_file.parent)
+            with open(self.digest_file, 'a', encoding='utf-8') as f:
+                f.write(f"{digest}\t{filepath}\n")
+        return None
     
     async def download_file(
         self,
@@ -37,29 +112,59 @@ class Downloader:
         state: str,
         assembly: str
     ) -> bool:
-        """Download a single file with retry logic."""
+        """
+        Download a single file with retry logic.
+        Data goes to <file>.part, which is renamed to filepath only once complete; a
+        .part left by a failed attempt (or an earlier run) is resumed with an HTTP Range request.
+        """
+        part_path = filepath.with_name(filepath.name + PARTIAL_SUFFIX)
         async with self.semaphore:
             for attempt in range(self.max_retries):
+                retry_after = None
                 try:
+                    await self.rate_limiter.acquire()
+                    offset = _file_size(part_path) or 0
                     # Use longer timeout for large files (30 minutes)
-                    # Disable automatic decompression and use read() for better performance
                     async with session.get(
                         url, 
+                        headers={'Range': f'bytes={offset}-'} if offset else None,
                         timeout=aiohttp.ClientTimeout(total=1800),
                         allow_redirects=True
                     ) as response:
-                        if response.status == 200:
-                            # Get expected file size
-                            total_size = int(response.headers.get('Content-Length', 0))
+                        if response.status == 416:
+                            # Partial file doesn't fit the server's copy (changed or already whole):
+                            # start over on the next attempt, after the backoff below
+                            self.logger.warning(f"Cannot resume {filepath.name}, downloading it again")
+                            part_path.unlink(missing_ok=True)
+                        
+                        elif response.status in (200, 206):
+                            # 206: server continues from offset; 200: it ignored the Range, start over
+                            resumed = response.status == 206
+                            if not resumed:
+                                offset = 0
                             
-                            # Read entire content at once for better performance (aiohttp handles buffering)
-                            # This is faster than iter_chunked for most cases
-                            content = await response.read()
-                            downloaded = len(content)
+                            # Get expected file size (Content-Length covers only the remainder when resuming)
+                            remaining = int(response.headers.get('Content-Length', 0))
+                            total_size = offset + remaining if remaining else 0
                             
-                            # Write to file
-                            async with aiofiles.open(filepath, 'wb') as f:
-                                await f.write(content)
+                            # Stream to disk as data arrives (memory stays flat however large the
+                            # file), fingerprinting the content on the way. Each buffer aiohttp
+                            # hands over goes straight to os.write in the default executor.
+                            loop = asyncio.get_running_loop()
+                            hasher = hashlib.blake2b(digest_size=DIGEST_SIZE)
+                            if resumed:
+                                self.logger.info(f"  ↻ Resuming {filepath.name} from {format_size(offset)}")
+                                await loop.run_in_executor(None, _hash_file, hasher, part_path)
+                            downloaded = offset
+                            flags = os.O_WRONLY | os.O_CREAT | (os.O_APPEND if resumed else os.O_TRUNC)
+                            fd = os.open(part_path, flags, 0o644)
+                            try:
+                                async for chunk in response.content.iter_any():
+                                    hasher.update(chunk)
+                                    downloaded += len(chunk)
+                                    await loop.run_in_executor(None, _write_all, fd, chunk)
+                            finally:
+                                os.close(fd)
                             
                             # Log completion
                             if total_size > 0:
@@ -70,58 +175,67 @@ class Downloader:
                             else:
                                 self.logger.info(f"  ✓ Downloaded {filepath.name}: {format_size(downloaded)}")
                             
-                            # Verify download completed
-                            actual_size = filepath.stat().st_size
-                            
                             # Check if download seems incomplete
-                            if total_size > 0 and actual_size < total_size * 0.9:  # Allow 10% tolerance
+                            if total_size > 0 and downloaded < total_size * 0.9:  # Allow 10% tolerance
+                                # Retried after the backoff below (the next attempt resumes from what was received)
                                 self.logger.warning(
-                                    f"Download may be incomplete: expected {format_size(total_size)}, got {format_size(actual_size)}"
+                                    f"Download may be incomplete: expected {format_size(total_size)}, got {format_size(downloaded)}"
                                 )
-                                # Delete incomplete file and retry
-                                filepath.unlink()
-                                if attempt < self.max_retries - 1:
-                                    continue
-                                return False
-                            
-                            size_str = format_size(actual_size)
-                            self.logger.download_progress(filepath.name, size_str)
-                            return True
+                            else:
+                                os.replace(part_path, filepath)
+                                
+                                # Same bytes as an earlier download: keep only a marker, so it isn't parsed twice
+                                original = self._find_duplicate(hasher.hexdigest(), filepath)
+                                if original:
+                                    filepath.unlink()
+                                    filepath.with_name(filepath.name + DUPLICATE_SUFFIX).touch()
+                                    self.logger.info(f"  ⊘ Duplicate content, skipping {filepath.name} (same as {original})")
+                                    return True
+                                
+                                size_str = format_size(downloaded)
+                                self.logger.download_progress(filepath.name, size_str)
+                                return True
                         
                         else:
                             self.logger.warning(
                                 f"Download failed for {url}: HTTP {response.status} (attempt {attempt + 1}/{self.max_retries})"
                             )
+                            # Client errors other than 429 won't succeed on retry
+                            if response.status not in RETRY_STATUSES:
+                                return False
+                            retry_after = response.headers.get('Retry-After')
                 
                 except asyncio.TimeoutError:
                     self.logger.warning(
                         f"Timeout downloading {url} (attempt {attempt + 1}/{self.max_retries})"
                     )
-                    # Delete partial file if exists
-                    if filepath.exists():
-                        filepath.unlink()
+                    # Partial data stays in the .part file for the next attempt to resume
                 
                 except Exception as e:
                     self.logger.warning(
                         f"Error downloading {url}: {e} (attempt {attempt + 1}/{self.max_retries})"
                     )
-                    # Delete partial file if exists
-                    if filepath.exists():
-                        filepath.unlink()
+                    # Partial data stays in the .part file for the next attempt to resume
                 
                 if attempt < self.max_retries - 1:
-                    await asyncio.sleep(2 ** attempt)  # Exponential backoff
+                    # Exponential backoff (1s, 2s, 4s, ...), or the server's Retry-After if longer
+                    delay = 2 ** attempt
+                    if retry_after and retry_after.isdigit():
+                        delay = max(delay, int(retry_after))
+                    await asyncio.sleep(delay)
             
             self.logger.error(f"Failed to download {url} after {self.max_retries} attempts")
             return False
     
     async def download_batch(
         self,
-        urls: List[Dict[str, str]]
+        urls: List[Dict[str, str]],
+        on_complete: Optional[Callable[[Dict[str, Any]], None]] = None
     ) -> List[Dict[str, Any]]:
         """
         Download a batch of URLs concurrently.
-        Returns list of download results with success status.
+        Returns list of download results with success status. If given, on_complete is
+        called with each downloaded (not skipped) file's result as soon as that file finishes.
         """
         results = []
         
@@ -134,6 +248,7 @@ class Downloader:
             read_bufsize=2 * 1024 * 1024  # 2MB read buffer
         ) as session:
             tasks = []
+            dir_paths: Dict[Tuple[str, str], Path] = {}  # Created once per (state, assembly)
             
             for url_data in urls:
                 state = sanitize_filename(url_data['state'])
@@ -152,49 +267,70 @@ class Downloader:
                     else:
                         filename += '.zip'
                 
-                # Sanitize assembly name - don't use "Download" or "Unknown"
-                assembly_clean = sanitize_filename(assembly)
-                if assembly_clean.lower() in ['download', 'unknown', '']:
-                    # Try to extract from filename or use a default
-                    assembly_clean = "Unknown_Assembly"
-                
-                # Create directory structure
-                dir_path = ensure_dir(Path(self.base_dir) / state / assembly_clean)
+                # Create directory structure (once per state/assembly)
+                dir_path = dir_paths.get((state, assembly))
+                if dir_path is None:
+                    # Sanitized assembly name - don't use "Download" or "Unknown"
+                    assembly_clean = assembly
+                    if assembly_clean.lower() in ['download', 'unknown', '']:
+                        # Try to extract from filename or use a default
+                        assembly_clean = "Unknown_Assembly"
+                    dir_path = dir_paths[(state, assembly)] = ensure_dir(Path(self.base_dir) / state / assembly_clean)
                 filepath = dir_path / filename
                 
-                # Skip if already exists (check file size to ensure it's complete)
-                if filepath.exists():
-                    file_size = filepath.stat().st_size
-                    if file_size > 0:
-                        self.logger.debug(f"Skipping existing file: {filepath.name} ({format_size(file_size)})")
-                        results.append({
-                            'state': url_data['state'],
-                            'assembly': url_data['assembly'],
-                            'url': url,
-                            'filepath': str(filepath),
-                            'success': True,
-                            'skipped': True,
-                            'size': file_size
-                        })
-                        continue
-                    else:
-                        self.logger.warning(f"Existing file is empty, re-downloading: {filepath.name}")
+                # Skip known duplicates (content already downloaded under another URL)
+                if filepath.with_name(filepath.name + DUPLICATE_SUFFIX).exists():
+                    self.logger.debug(f"Skipping duplicate file: {filepath.name}")
+                    results.append({
+                        'state': url_data['state'],
+                        'assembly': url_data['assembly'],
+                        'url': url,
+                        'filepath': str(filepath),
+                        'success': True,
+                        'skipped': True,
+                        'duplicate': True
+                    })
+                    continue
+                
+                # Skip if already exists (only complete downloads get the final name;
+                # interrupted ones are left as .part and resumed)
+                file_size = _file_size(filepath)
+                if file_size:
+                    self.logger.debug(f"Skipping existing file: {filepath.name} ({format_size(file_size)})")
+                    results.append({
+                        'state': url_data['state'],
+                        'assembly': url_data['assembly'],
+                        'url': url,
+                        'filepath': str(filepath),
+                        'success': True,
+                        'skipped': True,
+                        'size': file_size
+                    })
+                    continue
+                elif file_size == 0:
+                    self.logger.warning(f"Existing file is empty, re-downloading: {filepath.name}")
                 
                 # Create download task
                 task = self.download_file(session, url, filepath, state, assembly)
                 tasks.append((task, url_data, filepath))
             
-            # Execute all downloads
-            for task, url_data, filepath in tasks:
+            async def finish(task, url_data, filepath) -> Dict[str, Any]:
                 success = await task
-                results.append({
+                result = {
                     'state': url_data['state'],
                     'assembly': url_data['assembly'],
                     'url': url_data['url'],
                     'filepath': str(filepath),
                     'success': success,
-                    'skipped': False
-                })
+                    'skipped': False,
+                    'duplicate': success and filepath.with_name(filepath.name + DUPLICATE_SUFFIX).exists()
+                }
+                if on_complete:
+                    on_complete(result)
+                return result
+            
+            # Run all downloads together; the semaphore caps how many are in flight
+            results.extend(await asyncio.gather(*(finish(*task) for task in tasks)))
         
         return results
 
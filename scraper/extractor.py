@@ -2,14 +2,25 @@
 ZIP extractor to unzip downloaded files and validate PDFs
 """
 
+import os
+import shutil
+import threading
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Sequence
 
 from .utils import ensure_dir, save_checkpoint, load_checkpoint, sanitize_filename
 from .logger import Logger
 
 
+# Buffer for copying a decompressed ZIP entry to disk
+COPY_BUFFER_SIZE = 1 << 20
+
+# Suffix of the empty marker left in place of a ZIP removed after extraction
+EXTRACTED_SUFFIX = '.extracted'
+
+
 class Extractor:
     """Extract ZIP files and validate PDFs."""
     
@@ -17,30 +28,37 @@ class Extractor:
         self,
         logger: Logger,
         base_dir: str = "data/voterlists",
-        manifest_path: str = "data/manifest.json"
+        manifest_path: str = "data/manifest.json",
+        max_workers: Optional[int] = None
     ):
         self.logger = logger
         self.base_dir = Path(base_dir)
         self.manifest_path = manifest_path
+        # Threads extracting one assembly's ZIPs (zlib inflate and file writes release the GIL)
+        self.max_workers = max(1, max_workers or os.cpu_count() or 1)
+        self._manifest_lock = threading.Lock()  # extract_assembly may run in several threads
     
     def extract_zip(self, zip_path: Path, extract_dir: Path) -> List[str]:
-        """Extract ZIP file and return list of extracted PDF filenames."""
+        """Extract the PDFs in a ZIP file and return their filenames (paths within the ZIP)."""
         pdfs = []
+        root = extract_dir.resolve()
         
         try:
             with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                # List all files in ZIP
-                file_list = zip_ref.namelist()
-                
-                # Extract all files
-                zip_ref.extractall(extract_dir)
-                
-                # Filter PDFs
-                for filename in file_list:
-                    if filename.lower().endswith('.pdf'):
-                        pdf_path = extract_dir / filename
-                        if pdf_path.exists():
-                            pdfs.append(filename)
+                # Extract only the PDF entries; anything else in the archive is never written
+                for info in zip_ref.infolist():
+                    if info.is_dir() or not info.filename.lower().endswith('.pdf'):
+                        continue
+                    out_path = (root / info.filename).resolve()
+                    if not out_path.is_relative_to(root):
+                        self.logger.warning(f"Skipping entry outside the extract folder: {info.filename} in {zip_path.name}")
+                        continue
+                    # Stream the entry through a fixed buffer (exist_ok: other ZIPs of the
+                    # assembly may be creating the same folder concurrently)
+                    out_path.parent.mkdir(parents=True, exist_ok=True)
+                    with zip_ref.open(info) as src, open(out_path, 'wb') as dst:
+                        shutil.copyfileobj(src, dst, COPY_BUFFER_SIZE)
+                    pdfs.append(info.filename)
                 
                 self.logger.debug(f"Extracted {len(pdfs)} PDFs from {zip_path.name}")
                 return pdfs
@@ -55,20 +73,54 @@ class Extractor:
     
     def validate_pdf(self, pdf_path: Path) -> bool:
         """Basic PDF validation (check if file exists and has PDF header)."""
-        if not pdf_path.exists():
+        # Read the magic bytes with a raw descriptor (no file object, no separate exists() stat)
+        try:
+            fd = os.open(pdf_path, os.O_RDONLY)
+        except OSError:
             return False
-        
         try:
-            # Check PDF magic bytes
-            with open(pdf_path, 'rb') as f:
-                header = f.read(4)
-                return header == b'%PDF'
-        except Exception:
+            if hasattr(os, 'posix_fadvise'):
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_RANDOM)  # Only the header is needed, skip readahead
+            return os.read(fd, 4) == b'%PDF'
+        except OSError:
             return False
+        finally:
+            os.close(fd)
     
-    def extract_assembly(self, state: str, assembly: str) -> Dict[str, Any]:
+    def extract_and_remove(self, zip_path: Path) -> List[str]:
+        """
+        Extract a ZIP into its own folder, validate the PDFs and replace the ZIP with an
+        EXTRACTED_SUFFIX marker (so the download's content digest still has a file to point to).
+        Returns extracted PDFs.
+        """
+        extract_dir = zip_path.parent
+        pdfs = self.extract_zip(zip_path, extract_dir)
+        if pdfs:
+            # Validate extracted PDFs
+            for pdf_name in pdfs:
+                pdf_path = extract_dir / pdf_name
+                if not self.validate_pdf(pdf_path):
+                    self.logger.warning(f"Invalid PDF: {pdf_path}")
+            
+            # Remove ZIP after successful extraction (marker first: never a moment with neither)
+            try:
+                zip_path.with_name(zip_path.name + EXTRACTED_SUFFIX).touch()
+                zip_path.unlink()
+                self.logger.debug(f"Removed ZIP: {zip_path.name}")
+            except Exception as e:
+                self.logger.warning(f"Could not remove ZIP {zip_path}: {e}")
+        return pdfs
+    
+    def extract_assembly(
+        self,
+        state: str,
+        assembly: str,
+        extracted: Sequence[List[str]] = ()
+    ) -> Dict[str, Any]:
         """
         Extract all ZIPs for a state-assembly combination.
+        extracted holds the PDF lists of this assembly's ZIPs already handled by
+        extract_and_remove (e.g. as their downloads finished); they go into the manifest too.
         Returns manifest of extracted PDFs.
         """
         state_dir = self.base_dir / sanitize_filename(state)
@@ -81,46 +133,37 @@ class Extractor:
         # Find all ZIP files
         zip_files = list(assembly_dir.glob("*.zip"))
         
-        if not zip_files:
+        if not zip_files and not any(extracted):
             self.logger.info(f"No ZIP files found in {assembly_dir}")
             return {}
         
-        self.logger.info(f"Found {len(zip_files)} ZIP files in {assembly_dir}")
+        if zip_files:
+            self.logger.info(f"Found {len(zip_files)} ZIP files in {assembly_dir}")
+        
+        # Inflate the ZIPs in parallel
+        workers = min(self.max_workers, len(zip_files))
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="extract") as executor:
+                results = list(executor.map(self.extract_and_remove, zip_files))
+        else:
+            results = [self.extract_and_remove(zip_path) for zip_path in zip_files]
         
         all_pdfs = []
         extracted_count = 0
-        
-        for zip_path in zip_files:
-            pdfs = self.extract_zip(zip_path, assembly_dir)
-            
+        for pdfs in [*extracted, *results]:
             if pdfs:
                 all_pdfs.extend(pdfs)
                 extracted_count += 1
-                
-                # Validate extracted PDFs
-                valid_pdfs = []
-                for pdf_name in pdfs:
-                    pdf_path = assembly_dir / pdf_name
-                    if self.validate_pdf(pdf_path):
-                        valid_pdfs.append(pdf_name)
-                    else:
-                        self.logger.warning(f"Invalid PDF: {pdf_path}")
-                
-                # Remove ZIP after successful extraction
-                try:
-                    zip_path.unlink()
-                    self.logger.debug(f"Removed ZIP: {zip_path.name}")
-                except Exception as e:
-                    self.logger.warning(f"Could not remove ZIP {zip_path}: {e}")
         
         self.logger.extraction_progress(len(all_pdfs))
         
         # Update manifest
-        manifest = load_checkpoint(self.manifest_path)
-        if state not in manifest:
-            manifest[state] = {}
-        manifest[state][assembly] = all_pdfs
-        save_checkpoint(self.manifest_path, manifest)
+        with self._manifest_lock:
+            manifest = load_checkpoint(self.manifest_path)
+            if state not in manifest:
+                manifest[state] = {}
+            manifest[state][assembly] = all_pdfs
+            save_checkpoint(self.manifest_path, manifest)
         
         return {
             'state': state,
@@ -36,20 +36,34 @@ class Logger:
         console_handler.setLevel(logging.INFO)
         self.logger.addHandler(console_handler)
         
+        # File-only logger for lines the styled helpers already print to the console
+        self.file_logger = self.logger.getChild("file")
+        self.file_logger.propagate = False
+        
         # File handler (if save_logs enabled)
         self.file_handler: Optional[logging.FileHandler] = None
         if save_logs:
             ensure_dir(log_dir)
             log_file = Path(log_dir) / f"run_{get_timestamp()}.log"
-            self.file_handler = logging.FileHandler(log_file, encoding='utf-8')
-            self.file_handler.setLevel(logging.DEBUG)
-            formatter = logging.Formatter(
-                '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-            )
-            self.file_handler.setFormatter(formatter)
-            self.logger.addHandler(self.file_handler)
+            self.attach_file_handler(log_file)
             self.logger.info(f"Logging to file: {log_file}")
     
+    @property
+    def log_file(self) -> Optional[str]:
+        """Path of the current log file, if file logging is enabled."""
+        return self.file_handler.baseFilename if self.file_handler else None
+    
+    def attach_file_handler(self, log_file):
+        """Log DEBUG and above to log_file (appending if it already exists)."""
+        self.file_handler = logging.FileHandler(log_file, encoding='utf-8')
+        self.file_handler.setLevel(logging.DEBUG)
+        formatter = logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+        )
+        self.file_handler.setFormatter(formatter)
+        self.logger.addHandler(self.file_handler)
+        self.file_logger.addHandler(self.file_handler)
+    
     def info(self, message: str):
         """Log info message."""
         self.logger.info(message)
@@ -69,7 +83,7 @@ class Logger:
     def success(self, message: str):
         """Log success message with rich styling."""
         self.console.print(f"[green]✅ {message}[/green]")
-        self.logger.info(message)
+        self.file_logger.info(message)
     
     def state_assembly(self, state: str, assembly: str):
         """Display state and assembly header."""
@@ -79,27 +93,27 @@ class Logger:
             title="Processing"
         )
         self.console.print(panel)
-        self.logger.info(f"Processing State: {state}, Assembly: {assembly}")
+        self.file_logger.info(f"Processing State: {state}, Assembly: {assembly}")
     
     def download_progress(self, filename: str, size: str):
         """Log download progress."""
         self.console.print(f"→ [yellow]Downloading[/yellow] {filename}... ✅ {size}")
-        self.logger.info(f"Downloaded {filename} ({size})")
+        self.file_logger.info(f"Downloaded {filename} ({size})")
     
     def extraction_progress(self, count: int):
         """Log extraction progress."""
         self.console.print(f"→ [blue]Extracted[/blue] {count} PDFs")
-        self.logger.info(f"Extracted {count} PDFs")
+        self.file_logger.info(f"Extracted {count} PDFs")
     
     def parsing_progress(self, count: int):
         """Log parsing progress."""
         self.console.print(f"→ [magenta]Parsed[/magenta] {count:,} records")
-        self.logger.info(f"Parsed {count} records")
+        self.file_logger.info(f"Parsed {count} records")
     
     def db_progress(self, new: int, updated: int):
         """Log database insertion progress."""
         self.console.print(f"→ [green]Inserted:[/green] {new:,} new | {updated:,} updated")
-        self.logger.info(f"Database: {new} new, {updated} updated records")
+        self.file_logger.info(f"Database: {new} new, {updated} updated records")
     
     def create_progress(self) -> Progress:
         """Create a rich Progress instance."""
@@ -117,4 +131,5 @@ class Logger:
         if self.file_handler:
             self.file_handler.close()
             self.logger.removeHandler(self.file_handler)
+            self.file_logger.removeHandler(self.file_handler)
 
@@ -1,30 +1,126 @@
 """
-PDF parser using pdfplumber with OCR fallback (pytesseract)
+PDF parser using pdfplumber with OCR fallback (tesserocr or pytesseract)
 """
 
 import re
+import os
+import pickle
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+import tempfile
 import pdfplumber
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 
 from .logger import Logger
-from .utils import sanitize_filename
+from .utils import normalize_text, sanitize_filename
 
 # Optional OCR imports
 try:
     import pytesseract
-    from PIL import Image
     OCR_AVAILABLE = True
 except ImportError:
     OCR_AVAILABLE = False
 
+# Optional in-process Tesseract (avoids a subprocess and language data load per batch).
+# Pages are already OCRed in parallel, so keep each API single-threaded: OpenMP reads
+# OMP_THREAD_LIMIT once, when tesserocr loads it, so it must be set before the import.
+os.environ.setdefault('OMP_THREAD_LIMIT', '1')
+try:
+    from PIL import Image
+    from tesserocr import PyTessBaseAPI, PSM
+    TESSEROCR_AVAILABLE = True
+except ImportError:
+    TESSEROCR_AVAILABLE = False
+
+
+# Version of the records parse_pdf produces; bump it when parsing changes, so cached results are dropped
+PARSER_VERSION = 3
+
+# Original-language text fields, brought to one canonical form (normalize_text) by parse_pdf
+OG_FIELDS = ('name_og', 'relation_og', 'address_og')
+
+# extract_fields results kept per parser, for rows repeated across pages (headers, footers)
+FIELD_CACHE_SIZE = 4096
+
+# Relation indicators in OCR table rows (OCR may produce પ or ૫) and the relation each names.
+# The first relation in this order wins when a word carries several.
+RELATION_MARKERS = {
+    'Father': ('પિ.', 'પિતા', 'Father'),
+    'Mother': ('મા.', 'માતા', 'Mother'),
+    'Husband': ('પ.', '૫.', 'પતિ', 'Husband'),
+}
+RELATION_TYPES = {marker: relation for relation, markers in RELATION_MARKERS.items() for marker in markers}
+
+# OCR render zoom (1 = 72 DPI): wide pages (A4 and up) read fine at 2x, smaller ones get 3x
+OCR_ZOOM = 3
+OCR_ZOOM_WIDE = 2
+OCR_WIDE_PAGE_POINTS = 500
+
+# Per-process parser used by the parse ProcessPoolExecutor (see Pipeline)
+_worker_parser: Optional["Parser"] = None
+
+
+def parse_pool_context() -> multiprocessing.context.BaseContext:
+    """
+    Start method for parse worker processes. The pool starts them lazily, from a
+    process already running threads (event loop, checkpoint writer, executors), which
+    fork can deadlock; forkserver (spawn where unavailable) starts each one clean.
+    init_parse_worker builds all of a worker's state.
+    """
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return multiprocessing.get_context(method)
+
+
+def init_parse_worker(
+    use_ocr: bool = True,
+    log_file: Optional[str] = None,
+    ocr_concurrency: Optional[int] = None,
+    cache_dir: Optional[str] = None
+):
+    """Create the parser for a worker process (ProcessPoolExecutor initializer)."""
+    global _worker_parser
+    # Drop any handlers inherited from the parent (fork start method), so lines aren't logged twice
+    logging.getLogger("sir_scraper").handlers.clear()
+    logging.getLogger("sir_scraper.file").handlers.clear()
+    logger = Logger(save_logs=False)
+    if log_file:
+        logger.attach_file_handler(log_file)
+    _worker_parser = Parser(logger, use_ocr=use_ocr, ocr_concurrency=ocr_concurrency, cache_dir=cache_dir)
+
+
+def parse_pdf_in_worker(pdf_path: Path) -> List[Dict[str, Any]]:
+    """Parse a single PDF with this worker process's parser."""
+    if _worker_parser is None:
+        init_parse_worker()
+    return _worker_parser.parse_pdf(pdf_path)
+
 
 class Parser:
     """Parse PDFs to extract voter data with OCR fallback."""
     
-    def __init__(self, logger: Logger, use_ocr: bool = True):
+    def __init__(
+        self,
+        logger: Logger,
+        use_ocr: bool = True,
+        ocr_concurrency: Optional[int] = None,
+        cache_dir: Optional[str] = "data/parse_cache"
+    ):
         self.logger = logger
         self.use_ocr = use_ocr
+        # Parsed records of each PDF, keyed by content hash (None: don't cache)
+        self.cache_dir = cache_dir
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        # Max Tesseract subprocesses running at once per parser (default: one per CPU)
+        self.ocr_concurrency = max(1, ocr_concurrency or os.cpu_count() or 1)
+        # Idle tesserocr APIs, created on first OCR use and reused across pages and PDFs
+        self._tess_apis: List[Any] = []
+        # extract_fields results by text, oldest first (evicted past FIELD_CACHE_SIZE)
+        self._field_cache: Dict[str, Dict[str, Any]] = {}
         
         # Precompile regex patterns for field extraction
         # EPIC pattern: Can be "ABC1234567" or "001/000006" format
@@ -37,68 +133,267 @@ class Parser:
             'age': re.compile(r'(?:Age|ઉંમર|आयु)[:\s]+(\d+)', re.IGNORECASE),
             'gender': re.compile(r'(?:Gender|લિંગ|लिंग)[:\s]+(Male|Female|Other|પુરુષ|સ્ત્રી|पुरुष|स्त्री|પુ\.|સ્ત્રી)', re.IGNORECASE),
             'address': re.compile(r'(?:Address|સરનામું|पता)[:\s]+(.+?)(?:\n\n|$)', re.IGNORECASE | re.DOTALL),
+            # Something every field pattern above needs (an EPIC shape or a label), to skip other text in one scan
+            'field_hint': re.compile(
+                r'[A-Z]{3}\d{7}|\d{3}/\d{6}|Name|નામ|Father|Husband|પિતા|પતિ|Age|ઉંમર|आयु|'
+                r'Gender|લિંગ|लिंग|Address|સરનામું|पता',
+                re.IGNORECASE
+            ),
+            # Every label extract_pdf_metadata looks for, to find the lines worth inspecting in one scan
+            'metadata_labels': re.compile(
+                r'મુખ્ય ગામ|શહેરનું નામ|રેવન્યુ સર્કલ|તાલુકો|જિલ્લો|વિભાગ|કુલ|પુરુષ|પુરૂષ|પુ\.|સ્ત્રી|male|total',
+                re.IGNORECASE
+            ),
+            # extract_pdf_metadata
+            'epic_prefix': re.compile(r'([A-Z]{2}/\d{2})'),
+            'village': re.compile(r'[:]\s*([^,\n]+?)(?:\s*રેવન્યુ|\s*તાલુકો|\s*જિલ્લો|$)'),
+            'village_label': re.compile(r'\s*મુખ્ય ગામ.*?નામ\s*'),
+            'revenue_circle': re.compile(r'રેવન્યુ સર્કલ\s*[:]\s*([^,\n]+?)(?:\s*તાલુકો|\s*જિલ્લો|$)'),
+            'taluka': re.compile(r'તાલુકો\s*[:]\s*([^,\n]+?)(?:\s*જિલ્લો|$)'),
+            'district': re.compile(r'જિલ્લો\s*[:]\s*([^,\n]+?)(?:\s*વર્ગીકરણ|\s*કેન્દ્ર|$)'),
+            'district_suffix': re.compile(r'\s*વર્ગીકરણ.*$'),
+            'area': re.compile(r'વિભાગ\s*\d+\s*-\s*([^,-]+?)(?:\s*-\s*[^,]+|,|$)'),
+            'leading_number': re.compile(r'^\d+\s*'),
+            'count': re.compile(r'\b(\d{2,4})\b'),
+            'male_count': re.compile(r'(?:પુરુષ|Male|પુ\.)[:\s]+(\d+)', re.IGNORECASE),
+            'female_count': re.compile(r'(?:સ્ત્રી|Female)[:\s]+(\d+)', re.IGNORECASE),
+            # parse_ocr_table (applied to single words)
+            'epic_slash': re.compile(r'\d{3}/\d{6}'),
+            'epic_letters': re.compile(r'[A-Z]{3}\d{7}'),
+            'epic_letters_only': re.compile(r'^[A-Z]{3}\d{7}$'),
+            'digits_only': re.compile(r'^\d+$'),
+            'fraction_only': re.compile(r'^\d+/\d+$'),
+            'ocr_age': re.compile(r'\b(\d{2,3})\b'),
+            'care_prefix': re.compile(r'^કેર\s+'),
+            # parse_ocr_table (applied to lines / words): non-data rows, relation indicators
+            'ocr_skip': re.compile(r'વિભાગ|પૃષ્ઠ|ભાગ|સંબંધ|જાતિ|ઉંમર'),
+            'relation_mark': re.compile(r'પિ\.|મા\.|પ\.|૫\.|અ\.|U|Father|Husband|Mother'),
+            'relation_type': re.compile('|'.join(map(re.escape, RELATION_TYPES))),
         }
+        
+        # A whole, well-formed OCR table row, matched across the text in one finditer:
+        # Serial House Name... Relation RelationName... Gender Age EPIC. Tokens are chosen so
+        # the row reads exactly as parse_ocr_table's per-line parsing would read it.
+        epic_like = r'[A-Z]{3}\d{7}|\d{3}/\d{6}'
+        relation = r'પિ\.|મા\.|પ\.|૫\.|Father|Husband|Mother'
+        token = rf'(?!\S*?(?:{epic_like}))\S+'
+        name_token = rf'(?!\S*?(?:{epic_like}|{self.patterns["relation_mark"].pattern}|પિતા|માતા|પતિ))\S+'
+        self.patterns['ocr_row'] = re.compile(
+            rf'^(?![^\n]*(?:[Ee][Pp][Iiı][Cc]|નંબર|{self.patterns["ocr_skip"].pattern}))[ \t]*'
+            rf'\d+[ \t]+(?P<house>{token})[ \t]+(?P<name>(?:{name_token}[ \t]+)*)'
+            rf'(?P<rel>(?=\S*?(?:{relation})){token})[ \t]+(?P<relname>{token})(?:[ \t]+{token})*?'
+            rf'[ \t]+(?P<gender>{token})[ \t]+(?P<age>\d{{2,3}})[ \t]+(?P<epic>{epic_like})[ \t]*$',
+            re.MULTILINE
+        )
     
-    def extract_text_pdfplumber(self, pdf_path: Path) -> str:
-        """Extract text using pdfplumber."""
-        text = ""
+    def extract_pdfplumber(self, pdf_path: Path, with_text: bool = True) -> Tuple[str, List[List[List[Optional[str]]]]]:
+        """
+        Extract text (unless with_text is False) and tables using pdfplumber.
+        Both come from one open of the PDF, so its structure and each page's
+        characters are only parsed once. Returns (text, tables).
+        """
+        page_texts = []  # Joined once at the end (+= would copy the text so far on every page)
+        tables = []
+        find_tables = True
         try:
             with pdfplumber.open(pdf_path) as pdf:
                 for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
+                    if with_text:
+                        page_text = page.extract_text()
+                        if page_text:
+                            page_texts.append(page_text + "\n")
+                    if find_tables:
+                        try:
+                            tables.extend(page.extract_tables())
+                        except Exception as e:
+                            # Keep the tables found so far, stop looking
+                            self.logger.debug(f"Table extraction failed for {pdf_path.name}: {e}")
+                            find_tables = False
         except Exception as e:
             self.logger.warning(f"pdfplumber extraction failed for {pdf_path}: {e}")
-        return text
+        return "".join(page_texts), tables
     
-    def extract_text_pymupdf(self, pdf_path: Path) -> str:
-        """Extract text using PyMuPDF (fitz) - better for CID-encoded fonts."""
-        text = ""
+    def _open_pymupdf(self, pdf_path: Path) -> Optional[Any]:
+        """Open a PDF with PyMuPDF for the extractors to share, or None (they then report the problem)."""
         try:
             import fitz  # PyMuPDF
-            doc = fitz.open(pdf_path)
-            for page in doc:
-                page_text = page.get_text()
-                if page_text:
-                    text += page_text + "\n"
-            doc.close()
+            return fitz.open(pdf_path)
+        except Exception:
+            return None
+    
+    def extract_text_pymupdf(self, pdf_path: Path, doc: Optional[Any] = None) -> str:
+        """Extract text using PyMuPDF (fitz) - better for CID-encoded fonts. doc: an open document to read (left open)."""
+        page_texts = []
+        try:
+            import fitz  # PyMuPDF
+            own_doc = doc is None
+            if own_doc:
+                doc = fitz.open(pdf_path)
+            try:
+                for page in doc:
+                    page_text = page.get_text()
+                    if page_text:
+                        page_texts.append(page_text + "\n")
+            finally:
+                if own_doc:
+                    doc.close()
         except ImportError:
             self.logger.debug("PyMuPDF not available, skipping")
         except Exception as e:
             self.logger.warning(f"PyMuPDF extraction failed for {pdf_path}: {e}")
-        return text
+        return "".join(page_texts)
     
-    def extract_text_ocr(self, pdf_path: Path) -> str:
-        """Extract text using OCR (pytesseract)."""
-        if not self.use_ocr or not OCR_AVAILABLE:
-            if self.use_ocr and not OCR_AVAILABLE:
-                self.logger.warning("OCR requested but pytesseract/PIL not available")
+    def extract_text_ocr(self, pdf_path: Path, doc: Optional[Any] = None) -> str:
+        """
+        Extract text using OCR (in-process tesserocr if installed, else Tesseract subprocesses).
+        doc: an open PyMuPDF document to render (left open).
+        """
+        if not self.use_ocr or not (OCR_AVAILABLE or TESSEROCR_AVAILABLE):
+            if self.use_ocr:
+                self.logger.warning("OCR requested but neither pytesseract nor tesserocr is available")
             return ""
         
         text = ""
         try:
             # Use PyMuPDF for better image rendering
             import fitz  # PyMuPDF
-            doc = fitz.open(pdf_path)
-            for page_num, page in enumerate(doc):
-                # Render page as image with higher resolution (3x zoom for better OCR)
-                pix = page.get_pixmap(matrix=fitz.Matrix(3, 3))
-                # Convert to PIL Image
-                img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-                # OCR with PSM 6 (assume uniform block of text - better for tables)
-                # Use Gujarati + English languages
-                page_text = pytesseract.image_to_string(img, lang='guj+eng', config='--psm 6')
-                text += page_text + "\n"
-            doc.close()
+            own_doc = doc is None
+            if own_doc:
+                doc = fitz.open(pdf_path)
+            # Render pages in greyscale (OCR ignores colour) at higher resolution for better OCR
+            try:
+                pixmaps = []
+                for page in doc:
+                    zoom = OCR_ZOOM_WIDE if page.rect.width > OCR_WIDE_PAGE_POINTS else OCR_ZOOM
+                    pixmaps.append(page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csGRAY))
+            finally:
+                if own_doc:
+                    doc.close()
+            
+            if TESSEROCR_AVAILABLE:
+                # Wrap the pixmap buffers without copying; the images must go before the pixmaps
+                images = [
+                    Image.frombuffer("L", (pix.width, pix.height), pix.samples_mv, "raw", "L", pix.stride, 1)
+                    for pix in pixmaps
+                ]
+                try:
+                    text = self._ocr_pages_tesserocr(images)
+                finally:
+                    del images
+            else:
+                # OCR the pages in parallel batches (one Tesseract subprocess per batch)
+                text = asyncio.run(self._ocr_pages([pix.tobytes("png") for pix in pixmaps]))
         except Exception as e:
             self.logger.warning(f"OCR extraction failed for {pdf_path}: {e}")
         
         return text
     
+    def _ocr_pages_tesserocr(self, images: List["Image.Image"]) -> str:
+        """OCR page images in-process, in up to ocr_concurrency threads (tesserocr releases the GIL)."""
+        batches = min(self.ocr_concurrency, len(images))
+        if not batches:
+            return ""
+        size = -(-len(images) // batches)  # Ceiling division
+        
+        def ocr_batch(pages: List["Image.Image"]) -> str:
+            api = self._tess_apis.pop() if self._tess_apis else self._new_tess_api()
+            try:
+                texts = []
+                for page in pages:
+                    api.SetImage(page)
+                    # Same page separator as the Tesseract CLI output
+                    texts.append(api.GetUTF8Text() + "\f\n")
+                return "".join(texts)
+            finally:
+                self._tess_apis.append(api)
+        
+        if batches == 1:
+            return ocr_batch(images)
+        with ThreadPoolExecutor(max_workers=batches) as executor:
+            return "".join(executor.map(ocr_batch, (images[i:i + size] for i in range(0, len(images), size))))
+    
+    @staticmethod
+    def _new_tess_api() -> Any:
+        """Create a tesserocr API for Gujarati + English, PSM 6 (uniform block of text - better for tables)."""
+        return PyTessBaseAPI(lang='guj+eng', psm=PSM.SINGLE_BLOCK)
+    
+    def close(self):
+        """Release the tesserocr APIs (language data) held by this parser."""
+        while self._tess_apis:
+            self._tess_apis.pop().End()
+    
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+    
+    async def _ocr_pages(self, images: List[bytes]) -> str:
+        """
+        OCR page images and return their text in page order. The pages are split into
+        ocr_concurrency contiguous batches, each read by one Tesseract subprocess, so
+        language data is loaded once per batch instead of once per page.
+        """
+        batches = min(self.ocr_concurrency, len(images))
+        if not batches:
+            return ""
+        size = -(-len(images) // batches)  # Ceiling division
+        
+        async def ocr_batch(pages: List[bytes]) -> str:
+            try:
+                return await self._ocr_batch_async(pages)
+            except RuntimeError:
+                if len(pages) == 1:
+                    raise
+                # One unreadable page fails the whole batch: OCR its pages one by one
+                return "".join([await self._ocr_batch_async([page]) for page in pages])
+        
+        texts = await asyncio.gather(*(ocr_batch(images[i:i + size]) for i in range(0, len(images), size)))
+        return "".join(texts)
+    
+    async def _ocr_batch_async(self, images: List[bytes]) -> str:
+        """OCR PNG pages through one Tesseract subprocess (reading a list file of the page images)."""
+        with tempfile.TemporaryDirectory(prefix="ocr_") as tmp_dir:
+            paths = []
+            for n, image in enumerate(images):
+                path = os.path.join(tmp_dir, f"page{n:04d}.png")
+                with open(path, 'wb') as f:
+                    f.write(image)
+                paths.append(path)
+            list_file = os.path.join(tmp_dir, "pages.txt")
+            with open(list_file, 'w', encoding='utf-8') as f:
+                f.write("\n".join(paths) + "\n")
+            
+            # PSM 6 (assume uniform block of text - better for tables), Gujarati + English.
+            # OMP_THREAD_LIMIT=1: batches are already parallel, so keep each process single-threaded.
+            proc = await asyncio.create_subprocess_exec(
+                pytesseract.pytesseract.tesseract_cmd, list_file, 'stdout',
+                '-l', 'guj+eng', '--psm', '6',
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                env={**os.environ, 'OMP_THREAD_LIMIT': '1'}
+            )
+            stdout, stderr = await proc.communicate()
+        if proc.returncode != 0:
+            raise RuntimeError(f"tesseract exited with {proc.returncode}: {stderr.decode('utf-8', 'replace').strip()}")
+        # Tesseract ends each page with a form feed; keep a newline after it, as per-page OCR did
+        return stdout.decode('utf-8').replace('\f', '\f\n')
+    
     def extract_fields(self, text: str) -> Dict[str, Any]:
+        """Extract structured fields from text using regex (cached per text; callers get a copy)."""
+        cached = self._field_cache.get(text)
+        if cached is None:
+            cached = self._extract_fields(text)
+            if len(self._field_cache) >= FIELD_CACHE_SIZE:
+                del self._field_cache[next(iter(self._field_cache))]
+            self._field_cache[text] = cached
+        return dict(cached)
+    
+    def _extract_fields(self, text: str) -> Dict[str, Any]:
         """Extract structured fields from text using regex."""
         record = {}
+        if not self.patterns['field_hint'].search(text):
+            return record  # No pattern below can match (header, empty or numeric rows)
         
         # Extract EPIC number - try with label first, then just pattern
         epic_match = self.patterns['epic'].search(text)
@@ -140,34 +435,49 @@ class Parser:
         return record
     
     def parse_pdf(self, pdf_path: Path) -> List[Dict[str, Any]]:
-        """Parse a PDF file and return list of voter records."""
+        """Parse a PDF file and return list of voter records (from the cache if this content was parsed before)."""
+        cache_file = self._cache_file(pdf_path) if self.cache_dir else None
+        if cache_file:
+            try:
+                with open(cache_file, 'rb') as f:
+                    return pickle.load(f)
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                self.logger.warning(f"Ignoring unreadable parse cache {cache_file}: {e}")
+        
         records = []
+        # One PyMuPDF open serves both the text pass and the OCR rendering
+        doc = self._open_pymupdf(pdf_path)
         
         try:
             # Try PyMuPDF first (better for CID-encoded fonts)
-            text = self.extract_text_pymupdf(pdf_path)
+            text = self.extract_text_pymupdf(pdf_path, doc)
+            tables = None
             
-            # If PyMuPDF didn't work or returned empty, try pdfplumber
+            # If PyMuPDF didn't work or returned empty, try pdfplumber (tables come from the same pass)
             if not text.strip():
-                text = self.extract_text_pdfplumber(pdf_path)
+                text, tables = self.extract_pdfplumber(pdf_path)
             
             # Check if text is garbled (contains CID codes or has too many non-ASCII special chars)
             # PyMuPDF sometimes extracts garbled text with special chars like æ¤©¤≠ı¤¡ı
-            has_cid = '(cid:' in text
-            # Check if first 500 chars have too many non-printable/special characters
-            # (more than 30% non-alphanumeric, non-space, non-punctuation)
-            sample = text[:500] if len(text) > 500 else text
-            if sample:
-                special_chars = sum(1 for c in sample if not (c.isalnum() or c.isspace() or c in '.,;:()[]{}-\'\"'))
-                special_ratio = special_chars / len(sample) if len(sample) > 0 else 0
-                is_garbled = has_cid or (special_ratio > 0.3 and len(text.strip()) > 100)
-            else:
-                is_garbled = has_cid
+            # CID codes settle it; so does short text, which is never judged by its characters
+            is_garbled = '(cid:' in text
+            if not is_garbled and len(text.strip()) > 100:
+                # Check if first 500 chars have too many non-printable/special characters
+                # (more than 30% non-alphanumeric, non-space, non-punctuation)
+                sample = text[:500]
+                # Classify each distinct character once (a sample has a few dozen) and count it in C
+                special_chars = sum(
+                    sample.count(c) for c in set(sample)
+                    if not (c.isalnum() or c.isspace() or c in '.,;:()[]{}-\'\"')
+                )
+                is_garbled = special_chars / len(sample) > 0.3
             
             # If text is garbled or empty, try OCR
             if (is_garbled or not text.strip()) and self.use_ocr:
                 self.logger.info(f"Text extraction failed or garbled for {pdf_path.name}, using OCR...")
-                text = self.extract_text_ocr(pdf_path)
+                text = self.extract_text_ocr(pdf_path, doc)
                 if text.strip():
                     self.logger.debug(f"OCR extracted {len(text)} characters from {pdf_path.name}")
                     # Log first 200 chars to see format
@@ -181,22 +491,18 @@ class Parser:
             pdf_metadata = self.extract_pdf_metadata(text)
             
             # Try extracting from tables first (many voter lists are in table format)
-            try:
-                with pdfplumber.open(pdf_path) as pdf:
-                    for page in pdf.pages:
-                        tables = page.extract_tables()
-                        for table in tables:
-                            if table and len(table) > 1:  # Has header and data rows
-                                # Try to parse table rows as voter records
-                                for row in table[1:]:  # Skip header
-                                    if row and len(row) > 0:
-                                        # Join row cells into text and try to extract
-                                        row_text = ' '.join([str(cell) if cell else '' for cell in row])
-                                        record = self.extract_fields(row_text)
-                                        if record:  # Keep records even without EPIC
-                                            records.append(record)
-            except Exception as e:
-                self.logger.debug(f"Table extraction failed for {pdf_path.name}: {e}")
+            if tables is None:
+                _, tables = self.extract_pdfplumber(pdf_path, with_text=False)
+            for table in tables:
+                if table and len(table) > 1:  # Has header and data rows
+                    # Try to parse table rows as voter records
+                    for row in table[1:]:  # Skip header
+                        if row and len(row) > 0:
+                            # Join row cells into text and try to extract
+                            row_text = ' '.join([str(cell) if cell else '' for cell in row])
+                            record = self.extract_fields(row_text)
+                            if record:  # Keep records even without EPIC
+                                records.append(record)
             
             # If no records from tables, try parsing OCR text as table structure
             if not records:
@@ -237,56 +543,120 @@ class Parser:
                         else:
                             record['address_og'] = address
                 
-                # Store metadata for validation (but don't store in DB)
-                record['_pdf_metadata'] = pdf_metadata
+                # One canonical form for the OG text, whichever extraction path produced it
+                for field in OG_FIELDS:
+                    if record.get(field):
+                        record[field] = normalize_text(record[field])
         
         except Exception as e:
             self.logger.error(f"Error parsing {pdf_path}: {e}")
             import traceback
             self.logger.debug(traceback.format_exc())
+            return records
+        finally:
+            if doc is not None:
+                doc.close()
         
+        # Don't cache empty results: they may come from a missing or failing OCR engine
+        if cache_file and records:
+            self._save_cache(cache_file, records)
         return records
     
+    def _cache_file(self, pdf_path: Path) -> Optional[str]:
+        """Parse cache path for a PDF: its blake2b digest, PARSER_VERSION and OCR setting."""
+        try:
+            hasher = hashlib.blake2b(digest_size=16)
+            with open(pdf_path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    hasher.update(block)
+        except OSError:
+            return None  # parse_pdf reports the unreadable file
+        ocr = "ocr" if self.use_ocr else "no-ocr"
+        return os.path.join(self.cache_dir, f"{hasher.hexdigest()}.v{PARSER_VERSION}.{ocr}.pkl")
+    
+    def _save_cache(self, cache_file: str, records: List[Dict[str, Any]]):
+        """Write parsed records to the cache (atomically, as worker processes share it)."""
+        tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_file, 'wb') as f:
+                pickle.dump(records, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, cache_file)
+        except OSError as e:
+            self.logger.warning(f"Could not write parse cache {cache_file}: {e}")
+            try:
+                os.unlink(tmp_file)
+            except OSError:
+                pass
+    
     def parse_assembly(
         self,
         state: str,
         assembly: str,
         pdf_files: List[str],
-        base_dir: Path
+        base_dir: Path,
+        max_workers: Optional[int] = None
     ) -> List[Dict[str, Any]]:
-        """Parse all PDFs for an assembly and return all records."""
-        all_records = []
-        
+        """Parse all PDFs for an assembly and return all records (see iter_assembly)."""
+        return list(self.iter_assembly(state, assembly, pdf_files, base_dir, max_workers))
+    
+    def iter_assembly(
+        self,
+        state: str,
+        assembly: str,
+        pdf_files: List[str],
+        base_dir: Path,
+        max_workers: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Parse all PDFs for an assembly, yielding records one PDF at a time (in pdf_files order),
+        so callers can consume them without holding the whole assembly in memory.
+        Two or more PDFs are parsed in parallel worker processes (max_workers, default: one per CPU).
+        """
         state_dir = base_dir / sanitize_filename(state)
         assembly_dir = state_dir / sanitize_filename(assembly)
         
+        pdf_names, pdf_paths = [], []
         for pdf_name in pdf_files:
             pdf_path = assembly_dir / pdf_name
             
             if not pdf_path.exists():
                 self.logger.warning(f"PDF not found: {pdf_path}")
                 continue
-            
-            # Log progress for large batches
-            if len(pdf_files) > 10 and len(all_records) % 10 == 0:
-                self.logger.debug(f"Parsing PDF {len(all_records) // 10 * 10 + 1}/{len(pdf_files)}: {pdf_name}")
-            
-            records = self.parse_pdf(pdf_path)
-            
-            if records:
-                self.logger.debug(f"Extracted {len(records)} records from {pdf_name}")
-            
-            # Add metadata to each record
-            for record in records:
-                record['state'] = state
-                record['assembly'] = assembly
-                record['source_file'] = pdf_name
-                # Remove _pdf_metadata before saving (it's only for validation)
-                record.pop('_pdf_metadata', None)
-            
-            all_records.extend(records)
+            pdf_names.append(pdf_name)
+            pdf_paths.append(pdf_path)
+        
+        # Parsing and OCR are CPU-bound: use processes, each with its own Parser (see
+        # init_parse_worker), and split the OCR subprocesses between them
+        workers = min(max_workers or os.cpu_count() or 1, len(pdf_paths))
+        executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=parse_pool_context(),
+            initializer=init_parse_worker,
+            initargs=(self.use_ocr, self.logger.log_file, max(1, self.ocr_concurrency // workers), self.cache_dir)
+        ) if workers > 1 else None
         
-        return all_records
+        try:
+            # Results come back in pdf_files order
+            results = executor.map(parse_pdf_in_worker, pdf_paths) if executor else map(self.parse_pdf, pdf_paths)
+            for parsed, (pdf_name, records) in enumerate(zip(pdf_names, results), 1):
+                # Log progress for large batches
+                if len(pdf_paths) > 10 and parsed % 10 == 0:
+                    self.logger.debug(f"Parsed PDF {parsed}/{len(pdf_paths)}: {pdf_name}")
+                
+                if records:
+                    self.logger.debug(f"Extracted {len(records)} records from {pdf_name}")
+                
+                # Add metadata to each record
+                for record in records:
+                    record['state'] = state
+                    record['assembly'] = assembly
+                    record['source_file'] = pdf_name
+                
+                yield from records
+        finally:
+            if executor:
+                # Drop PDFs not yet started if the caller stopped iterating early
+                executor.shutdown(cancel_futures=True)
     
     def extract_pdf_metadata(self, text: str) -> Dict[str, Any]:
         """Extract metadata from PDF: EPIC prefix, address components, voter counts."""
@@ -299,15 +669,24 @@ class Parser:
         lines = text.split('\n')
         
         # Extract EPIC prefix (e.g., "GJ/01" from header)
-        for line in lines[:50]:  # Check first 50 lines
-            # Look for pattern like "GJ/01" or "EPIC નંબર GJ/01"
-            epic_prefix_match = re.search(r'([A-Z]{2}/\d{2})', line)
-            if epic_prefix_match:
-                metadata['epic_prefix'] = epic_prefix_match.group(1)
-                break
+        # Look for pattern like "GJ/01" or "EPIC નંબર GJ/01" in the first 50 lines
+        epic_prefix_match = self.patterns['epic_prefix'].search('\n'.join(lines[:50]))
+        if epic_prefix_match:
+            metadata['epic_prefix'] = epic_prefix_match.group(1)
+        
+        # Most lines are voter entries that mention none of the labels below. Find the ones
+        # that do with a single scan of the text and only inspect those (in line order).
+        candidates = []
+        line_no = pos = 0
+        for label in self.patterns['metadata_labels'].finditer(text):
+            line_no += text.count('\n', pos, label.start())
+            pos = label.start()
+            if not candidates or candidates[-1] != line_no:
+                candidates.append(line_no)
         
         # Extract address components
-        for i, line in enumerate(lines):
+        for i in candidates:
+            line = lines[i]
             if not line or not isinstance(line, str):
                 continue
             line_lower = line.lower()
@@ -315,18 +694,18 @@ class Parser:
             # Village/City name - look for pattern like "મુખ્ય ગામ/શહેરનું નામ : છેરનાની"
             if 'મુખ્ય ગામ' in line or 'શહેરનું નામ' in line:
                 # Extract name after colon, but clean it up
-                match = re.search(r'[:]\s*([^,\n]+?)(?:\s*રેવન્યુ|\s*તાલુકો|\s*જિલ્લો|$)', line)
+                match = self.patterns['village'].search(line)
                 if match:
                     village = match.group(1).strip()
                     # Remove common prefixes
-                    village = re.sub(r'^\d+\s*', '', village)  # Remove leading numbers
-                    village = re.sub(r'\s*મુખ્ય ગામ.*?નામ\s*', '', village)  # Remove label text
+                    village = self.patterns['leading_number'].sub('', village)  # Remove leading numbers
+                    village = self.patterns['village_label'].sub('', village)  # Remove label text
                     if village and len(village) < 50:  # Reasonable length
                         metadata['address_components']['village_city'] = village.strip()
             
             # Revenue Circle - look for "રેવન્યુ સર્કલ : દયાપર"
             if 'રેવન્યુ સર્કલ' in line:
-                match = re.search(r'રેવન્યુ સર્કલ\s*[:]\s*([^,\n]+?)(?:\s*તાલુકો|\s*જિલ્લો|$)', line)
+                match = self.patterns['revenue_circle'].search(line)
                 if match:
                     rc = match.group(1).strip()
                     if rc and len(rc) < 50:
@@ -334,7 +713,7 @@ class Parser:
             
             # Taluka - look for "તાલુકો : લખપત"
             if 'તાલુકો' in line:
-                match = re.search(r'તાલુકો\s*[:]\s*([^,\n]+?)(?:\s*જિલ્લો|$)', line)
+                match = self.patterns['taluka'].search(line)
                 if match:
                     taluka = match.group(1).strip()
                     if taluka and len(taluka) < 50:
@@ -342,11 +721,11 @@ class Parser:
             
             # District - look for "જિલ્લો : કચ્છ"
             if 'જિલ્લો' in line:
-                match = re.search(r'જિલ્લો\s*[:]\s*([^,\n]+?)(?:\s*વર્ગીકરણ|\s*કેન્દ્ર|$)', line)
+                match = self.patterns['district'].search(line)
                 if match:
                     district = match.group(1).strip()
                     # Clean up common suffixes
-                    district = re.sub(r'\s*વર્ગીકરણ.*$', '', district)
+                    district = self.patterns['district_suffix'].sub('', district)
                     if district and len(district) < 50:
                         metadata['address_components']['district'] = district
             
@@ -354,23 +733,24 @@ class Parser:
             if 'વિભાગ' in line and '-' in line:
                 # Format: "વિભાગ 1 - છેરનાની - છેરનાની, પિન કોડ - 370627"
                 # Extract the area name (the part after first dash, before second dash or comma)
-                match = re.search(r'વિભાગ\s*\d+\s*-\s*([^,-]+?)(?:\s*-\s*[^,]+|,|$)', line)
+                match = self.patterns['area'].search(line)
                 if match:
                     area = match.group(1).strip()
                     # Clean up - remove common prefixes/suffixes
-                    area = re.sub(r'^\d+\s*', '', area)  # Remove leading numbers
+                    area = self.patterns['leading_number'].sub('', area)  # Remove leading numbers
                     if area and len(area) > 1 and len(area) < 50:  # At least 2 chars
                         metadata['address_components']['area'] = area
         
         # Extract voter counts (total, male, female)
         # Look for table format: "કુલ પુરુષ સ્ત્રી" followed by numbers
-        for i, line in enumerate(lines):
+        for i in candidates:
+            line = lines[i]
             if not line or not isinstance(line, str):
                 continue
             
             # Look for patterns like "કુલ 609" or "Total 609" or "કુલ 282 327 609"
             # Try to find a line with multiple numbers that might be male/female/total
-            numbers = re.findall(r'\b(\d{2,4})\b', line)
+            numbers = self.patterns['count'].findall(line)
             
             # If line contains "કુલ" or "Total", extract numbers
             if 'કુલ' in line or 'Total' in line.lower():
@@ -390,7 +770,7 @@ class Parser:
                         pass
             
             # Look for patterns like "પુરુષ 282" or "Male 282"
-            male_match = re.search(r'(?:પુરુષ|Male|પુ\.)[:\s]+(\d+)', line, re.IGNORECASE)
+            male_match = self.patterns['male_count'].search(line)
             if male_match:
                 try:
                     metadata['voter_counts']['male'] = int(male_match.group(1))
@@ -398,7 +778,7 @@ class Parser:
                     pass
             
             # Look for patterns like "સ્ત્રી 327" or "Female 327"
-            female_match = re.search(r'(?:સ્ત્રી|Female)[:\s]+(\d+)', line, re.IGNORECASE)
+            female_match = self.patterns['female_count'].search(line)
             if female_match:
                 try:
                     metadata['voter_counts']['female'] = int(female_match.group(1))
@@ -414,7 +794,7 @@ class Parser:
                     next_line = lines[j] if j < len(lines) else ''
                     if next_line and isinstance(next_line, str):
                         # Look for line with 3 numbers (male, female, total)
-                        nums = re.findall(r'\b(\d{2,4})\b', next_line)
+                        nums = self.patterns['count'].findall(next_line)
                         # Filter out numbers that are too small (likely page numbers or serials)
                         nums = [n for n in nums if 10 <= int(n) <= 10000]
                         if len(nums) >= 3:
@@ -485,13 +865,20 @@ class Parser:
         Example: "1 1ક કેર ઇસાક પિ. આમદ પુ. 41 001/000006"
         """
         records = []
-        lines = text.split('\n')
         
         # Look for header row to identify column positions
         header_found = False
         epic_col_idx = None
         
-        for i, line in enumerate(lines):
+        for line in self._ocr_table_lines(text):
+            if isinstance(line, re.Match):
+                if not epic_col_idx:
+                    record = self._ocr_row_record(line)
+                    if record.get('name_og') or record.get('age'):
+                        records.append(record)
+                    continue
+                # A header gave the EPIC column: parse the row like any other line
+                line = line.group()
             if not line or not isinstance(line, str):
                 continue
             line = line.strip()
@@ -510,7 +897,7 @@ class Parser:
                 continue
             
             # Skip lines that are clearly not data rows
-            if any(x in line for x in ['વિભાગ', 'પૃષ્ઠ', 'ભાગ', 'સંબંધ', 'જાતિ', 'ઉંમર']):
+            if self.patterns['ocr_skip'].search(line):
                 continue
             
             # Try to extract EPIC number from line (format: XXX/XXXXXX or ABC1234567)
@@ -534,7 +921,7 @@ class Parser:
                 # Usually format: ... Age EPIC
                 if len(parts) >= 2:
                     # Last part might be EPIC, second last might be age
-                    if re.match(r'\d{3}/\d{6}', parts[-1]) or re.match(r'[A-Z]{3}\d{7}', parts[-1]):
+                    if self.patterns['epic_slash'].match(parts[-1]) or self.patterns['epic_letters'].match(parts[-1]):
                         epic_pos = len(parts) - 1
             
             # Extract fields (working backwards from EPIC if found)
@@ -557,7 +944,7 @@ class Parser:
                 # Look for age pattern (2-3 digits) near the end
                 for j in range(len(parts) - 3, len(parts)):
                     if j >= 0 and j < len(parts):
-                        age_match = re.search(r'\b(\d{2,3})\b', parts[j])
+                        age_match = self.patterns['ocr_age'].search(parts[j])
                         if age_match:
                             try:
                                 age = int(age_match.group(1))
@@ -583,7 +970,7 @@ class Parser:
             
             # Age is usually before EPIC
             if epic_pos > 0:
-                age_match = re.search(r'\b(\d{2,3})\b', parts[epic_pos - 1])
+                age_match = self.patterns['ocr_age'].search(parts[epic_pos - 1])
                 if age_match:
                     try:
                         record['age'] = int(age_match.group(1))
@@ -611,7 +998,7 @@ class Parser:
             for j in range(name_start, min(epic_pos, len(parts))):
                 part = parts[j]
                 # Check for relation indicators (including Unicode variants)
-                if any(x in part for x in ['પિ.', 'મા.', 'પ.', '૫.', 'અ.', 'U', 'Father', 'Husband', 'Mother']):
+                if self.patterns['relation_mark'].search(part):
                     relation_start = j
                     break
             
@@ -622,16 +1009,16 @@ class Parser:
                     if j < len(parts):
                         part = parts[j]
                         # Skip if it's clearly not a name (pure numbers, EPIC patterns)
-                        if re.match(r'^\d+$', part) or re.match(r'\d{3}/\d{6}', part) or re.match(r'^[A-Z]{3}\d{7}$', part):
+                        if self.patterns['digits_only'].match(part) or self.patterns['epic_slash'].match(part) or self.patterns['epic_letters_only'].match(part):
                             continue
                         name_parts.append(part)
                 
                 if name_parts:
                     name = ' '.join(name_parts)
                     # Remove "કેર" prefix if present (house/household indicator)
-                    name = re.sub(r'^કેર\s+', '', name).strip()
+                    name = self.patterns['care_prefix'].sub('', name).strip()
                     # Don't set name if it's empty, just a dash, or looks like EPIC/number
-                    if name and name != '-' and not re.match(r'^\d+/\d+$', name) and not re.match(r'^[A-Z]{3}\d{7}$', name):
+                    if name and name != '-' and not self.patterns['fraction_only'].match(name) and not self.patterns['epic_letters_only'].match(name):
                         record['name_og'] = name
             
             # Extract relation type and relation name separately
@@ -639,34 +1026,62 @@ class Parser:
             # relation_type: "Father", "Husband", "Mother"
             # relation_og: just the relation name in OG (e.g., "આમદ")
             for j in range(name_start, min(len(parts), epic_pos - 2)):
-                part = parts[j]
-                if 'પિ.' in part or 'પિતા' in part or 'Father' in part:
-                    record['relation_type'] = 'Father'
+                relation_type = self._relation_type(parts[j])
+                if relation_type:
+                    record['relation_type'] = relation_type
                     # Next part is the relation name (just the name, not the type)
                     if j + 1 < len(parts):
                         rel_name = parts[j + 1]
                         if rel_name and rel_name != '-' and not rel_name.isdigit():
                             record['relation_og'] = rel_name.strip()
                     break
-                elif 'મા.' in part or 'માતા' in part or 'Mother' in part:
-                    record['relation_type'] = 'Mother'
-                    if j + 1 < len(parts):
-                        rel_name = parts[j + 1]
-                        if rel_name and rel_name != '-' and not rel_name.isdigit():
-                            record['relation_og'] = rel_name.strip()
-                    break
-                elif 'પ.' in part or '૫.' in part or 'પતિ' in part or 'Husband' in part:
-                    # Both પ. and ૫. are variants of "husband/wife" relation
-                    record['relation_type'] = 'Husband'
-                    if j + 1 < len(parts):
-                        rel_name = parts[j + 1]
-                        if rel_name and rel_name != '-' and not rel_name.isdigit():
-                            record['relation_og'] = rel_name.strip()
-                    break
             
             # Keep record if it has at least name or age (don't require EPIC)
             if record.get('name_og') or record.get('age'):
                 records.append(record)
         
         return records
+    
+    def _relation_type(self, part: str) -> Optional[str]:
+        """Relation named by a word of an OCR row ('Father', 'Mother', 'Husband'), or None."""
+        markers = self.patterns['relation_type'].findall(part)
+        if not markers:
+            return None
+        if len(markers) == 1:
+            return RELATION_TYPES[markers[0]]
+        found = {RELATION_TYPES[marker] for marker in markers}
+        return next(relation for relation in RELATION_MARKERS if relation in found)
+    
+    def _ocr_table_lines(self, text: str):
+        """Yield ocr_row matches for well-formed rows and the text between them line by line."""
+        pos = 0
+        for match in self.patterns['ocr_row'].finditer(text):
+            yield from text[pos:match.start()].split('\n')
+            yield match
+            pos = match.end()
+        yield from text[pos:].split('\n')
+    
+    def _ocr_row_record(self, match: "re.Match") -> Dict[str, Any]:
+        """Build the record for an ocr_row match (same fields as the per-line parsing)."""
+        record = {'epic_no': match['epic']}
+        if match['house'] != '-':
+            record['house_no'] = match['house']
+        record['age'] = int(match['age'])
+        gender_text = match['gender']
+        if 'પુ' in gender_text or 'પુરુષ' in gender_text or 'Male' in gender_text:
+            record['gender'] = 'Male'
+        elif 'સ્ત્રી' in gender_text or 'Female' in gender_text:
+            record['gender'] = 'Female'
+        
+        name_parts = [part for part in match['name'].split() if not self.patterns['digits_only'].match(part)]
+        if name_parts:
+            name = self.patterns['care_prefix'].sub('', ' '.join(name_parts)).strip()
+            if name and name != '-' and not self.patterns['fraction_only'].match(name) and not self.patterns['epic_letters_only'].match(name):
+                record['name_og'] = name
+        
+        record['relation_type'] = self._relation_type(match['rel'])
+        rel_name = match['relname']
+        if rel_name != '-' and not rel_name.isdigit():
+            record['relation_og'] = rel_name
+        return record
 
@@ -3,20 +3,50 @@
 """
 
 import asyncio
+import itertools
+import os
 from pathlib import Path
-from typing import List, Dict, Any, Optional
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
 
 from .logger import Logger
 from .downloader import Downloader
 from .extractor import Extractor
-from .parser import Parser
+from .parser import Parser, init_parse_worker, parse_pdf_in_worker, parse_pool_context
 from .translator import VoterTranslator
 from .db_loader import DBLoader
 from .checkpoint import CheckpointManager
 from .utils import sanitize_filename
 
 
+# PDFs submitted to the parse pool per worker at a time (one parsing, one queued behind it)
+PARSE_IN_FLIGHT_PER_WORKER = 2
+
+# With translation on, parsed records are collected across PDFs up to this many before each
+# translate + insert, so values are deduplicated over many PDFs and the per-batch cost is paid rarely
+TRANSLATE_BATCH_RECORDS = 10_000
+
+
+def _find_pdfs(root: Path) -> List[Path]:
+    """
+    PDFs anywhere under root, sorted. Walks with os.scandir, which tells directories
+    from files without a stat call per entry (root missing: none).
+    """
+    pdf_paths = []
+    pending = [str(root)]
+    while pending:
+        try:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    elif entry.name.endswith('.pdf'):
+                        pdf_paths.append(entry.path)
+        except FileNotFoundError:
+            continue
+    return sorted(map(Path, pdf_paths))
+
+
 class Pipeline:
     """3-stage pipeline: Download → Parse → Store"""
     
@@ -42,6 +72,17 @@ class Pipeline:
         self.max_parse_workers = max_parse_workers
         self.max_translate_workers = max_translate_workers
         
+        # One process pool shared by all constituencies. OCR and PDF text extraction
+        # are CPU-bound and hold the GIL, so threads don't scale past 1-2 workers.
+        # Each worker OCRs pages in parallel; split the CPUs between workers.
+        ocr_concurrency = max(1, (os.cpu_count() or 1) // max(1, max_parse_workers))
+        self._parse_pool = ProcessPoolExecutor(
+            max_workers=max_parse_workers,
+            mp_context=parse_pool_context(),
+            initializer=init_parse_worker,
+            initargs=(parser.use_ocr, logger.log_file, ocr_concurrency, parser.cache_dir)
+        )
+        
         # Update translator workers if translator exists
         if self.translator:
             self.translator.max_workers = max_translate_workers
@@ -50,9 +91,15 @@ class Pipeline:
         self,
         state: str,
         assembly: str,
-        urls: List[Dict[str, str]]
+        urls: List[Dict[str, str]],
+        on_complete: Optional[Callable[[Dict[str, Any]], None]] = None
     ) -> Dict[str, Any]:
-        """Stage 1: Download ZIP files (parallel, skip if exists)."""
+        """
+        Stage 1: Download ZIP files (parallel, skip if exists). on_complete: see Downloader.download_batch.
+        A completed download is skipped unless urls holds URLs it didn't cover (a later batch
+        for the assembly); those alone are downloaded, and the assembly's stored records are
+        marked for redoing (db 'in_progress'), so stages 2 and 3 run again over all its PDFs.
+        """
         self.logger.info(f"\n{'='*80}")
         self.logger.info(f"STAGE 1: DOWNLOAD - {state}/{assembly}")
         self.logger.info(f"{'='*80}")
@@ -60,9 +107,15 @@ class Pipeline:
         
         # Check checkpoint
         status = self.checkpoint.get_constituency_status(state, assembly)
-        if status.get('download', {}).get('status') == 'completed':
-            self.logger.info(f"✓ Download already completed (skipping)")
-            return status['download']['data']
+        earlier = status['download']['data'] if status.get('download', {}).get('status') == 'completed' else None
+        if earlier is not None:
+            known_urls = set(earlier['urls']) if 'urls' in earlier else None
+            # Checkpoints written before URLs were recorded count as covering every URL
+            if known_urls is None or all(url_data['url'] in known_urls for url_data in urls):
+                self.logger.info(f"✓ Download already completed (skipping)")
+                return earlier
+            urls = [url_data for url_data in urls if url_data['url'] not in known_urls]
+            self.logger.info(f"{len(urls)} new URL(s) since the download completed, downloading them")
         
         # Mark as in progress
         self.checkpoint.save_checkpoint(
@@ -71,15 +124,17 @@ class Pipeline:
         )
         
         # Download (parallel, skips existing files)
-        download_results = await self.downloader.download_batch(urls)
+        download_results = await self.downloader.download_batch(urls, on_complete=on_complete)
         
         successful = [r for r in download_results if r['success']]
         failed = [r for r in download_results if not r['success']]
         skipped = [r for r in download_results if r.get('skipped', False)]
+        duplicates = [r for r in download_results if r.get('duplicate', False)]
         
         self.logger.info(f"Download Results:")
         self.logger.info(f"  ✓ Successful: {len(successful)}")
         self.logger.info(f"  ⊘ Skipped (exists): {len(skipped)}")
+        self.logger.info(f"  ⊘ Duplicate content: {len(duplicates)}")
         self.logger.info(f"  ✗ Failed: {len(failed)}")
         
         if failed:
@@ -92,8 +147,17 @@ class Pipeline:
             'successful': len(successful),
             'skipped': len(skipped),
             'failed': len(failed),
-            'files': [r.get('filepath') for r in successful + skipped]
+            'duplicates': [r['url'] for r in duplicates],
+            'files': [r.get('filepath') for r in successful + skipped if not r.get('duplicate', False)],
+            # URLs covered (not the failed ones, so a later batch retries them)
+            'urls': [r['url'] for r in successful + skipped]
         }
+        if earlier is not None:
+            download_data['duplicates'] = earlier.get('duplicates', []) + download_data['duplicates']
+            download_data['files'] = earlier.get('files', []) + download_data['files']
+            download_data['urls'] = earlier['urls'] + download_data['urls']
+            # Records stored from the earlier files only: delete and store the assembly again
+            self.checkpoint.save_checkpoint(state, assembly, 'db', 'in_progress', {'started': False})
         
         self.checkpoint.save_checkpoint(
             state, assembly, 'download', 'completed',
@@ -107,16 +171,22 @@ class Pipeline:
         self,
         state: str,
         assembly: str,
-        base_dir: Path
+        base_dir: Path,
+        sink: Optional[Callable[[List[Dict[str, Any]]], None]] = None
     ) -> Dict[str, Any]:
-        """Stage 2: Parse PDFs (parallel within constituency)."""
+        """
+        Stage 2: Parse PDFs (parallel within constituency).
+        sink: called with each PDF's records as it is parsed; the records are then not
+        kept (nor checkpointed), and the parse always runs. Without it they are returned
+        in the checkpoint data under 'records'.
+        """
         self.logger.info(f"\n{'='*80}")
         self.logger.info(f"STAGE 2: PARSE - {state}/{assembly}")
         self.logger.info(f"{'='*80}")
         
         # Check checkpoint
         status = self.checkpoint.get_constituency_status(state, assembly)
-        if status.get('parse', {}).get('status') == 'completed':
+        if sink is None and status.get('parse', {}).get('status') == 'completed':
             self.logger.info(f"✓ Parse already completed (skipping)")
             return status['parse']['data']
         
@@ -124,7 +194,7 @@ class Pipeline:
         state_dir = base_dir / sanitize_filename(state)
         assembly_dir = state_dir / sanitize_filename(assembly)
         
-        pdf_files = sorted(assembly_dir.rglob('*.pdf'))
+        pdf_files = _find_pdfs(assembly_dir)
         total_pdfs = len(pdf_files)
         
         if total_pdfs == 0:
@@ -132,16 +202,17 @@ class Pipeline:
             parse_data = {
                 'total_pdfs': 0,
                 'parsed_pdfs': 0,
-                'total_records': 0,
-                'records': []
+                'total_records': 0
             }
+            if sink is None:
+                parse_data['records'] = []
             self.checkpoint.save_checkpoint(
                 state, assembly, 'parse', 'completed', parse_data
             )
             return parse_data
         
         self.logger.info(f"Found {total_pdfs} PDF file(s) to parse")
-        self.logger.info(f"Using {self.max_parse_workers} parallel workers")
+        self.logger.info(f"Using {self.max_parse_workers} parallel worker processes")
         
         # Mark as in progress
         self.checkpoint.save_checkpoint(
@@ -151,75 +222,82 @@ class Pipeline:
         
         # Parse in parallel
         all_records = []
+        total_records = 0
         parsed_count = 0
         failed_count = 0
         
-        def parse_single_pdf(pdf_path: Path) -> tuple:
-            """Parse a single PDF and return (success, records, pdf_name)."""
-            try:
-                records = self.parser.parse_pdf(pdf_path)
-                
-                # Add metadata
-                for record in records:
-                    record['state'] = state
-                    record['assembly'] = assembly
-                    record['source_file'] = pdf_path.name
-                    record.pop('_pdf_metadata', None)
-                
-                return (True, records, pdf_path.name)
-            except Exception as e:
-                self.logger.error(f"Error parsing {pdf_path.name}: {e}")
-                return (False, [], pdf_path.name)
-        
-        # Use ThreadPoolExecutor for parallel parsing
-        with ThreadPoolExecutor(max_workers=self.max_parse_workers) as executor:
-            # Submit all tasks
-            future_to_pdf = {
-                executor.submit(parse_single_pdf, pdf_path): pdf_path
-                for pdf_path in pdf_files
-            }
-            
-            # Process results as they complete
-            for future in as_completed(future_to_pdf):
-                pdf_path = future_to_pdf[future]
-                try:
-                    success, records, pdf_name = future.result()
+        # Parse in the shared process pool, with at most PARSE_IN_FLIGHT_PER_WORKER PDFs per
+        # worker submitted at a time: a slow sink then stalls submission instead of letting
+        # finished results (each holding a PDF's records) pile up
+        unsubmitted = iter(pdf_files)
+        in_flight: Dict[Future, Path] = {}
+        max_in_flight = PARSE_IN_FLIGHT_PER_WORKER * self.max_parse_workers
+        
+        def submit_more():
+            for pdf_path in itertools.islice(unsubmitted, max_in_flight - len(in_flight)):
+                in_flight[self._parse_pool.submit(parse_pdf_in_worker, pdf_path)] = pdf_path
+        
+        # Process results as they complete
+        try:
+            submit_more()
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                while done:
+                    future = done.pop()
+                    pdf_path = in_flight.pop(future)  # Dropping the future frees its result
+                    try:
+                        records = future.result()
+                    except Exception as e:
+                        self.logger.error(f"Error parsing {pdf_path.name}: {e}")
+                        failed_count += 1
+                        continue
                     
-                    if success:
-                        all_records.extend(records)
-                        parsed_count += 1
-                        
-                        if parsed_count % 10 == 0:
-                            self.logger.info(
-                                f"  Progress: {parsed_count}/{total_pdfs} PDFs parsed, "
-                                f"{len(all_records):,} records extracted"
-                            )
+                    # Add metadata
+                    for record in records:
+                        record['state'] = state
+                        record['assembly'] = assembly
+                        record['source_file'] = pdf_path.name
+                    
+                    # A failing sink (e.g. the database) fails the stage, not just this PDF
+                    if sink is not None:
+                        sink(records)
                     else:
-                        failed_count += 1
-                        
-                except Exception as e:
-                    self.logger.error(f"Error processing {pdf_path.name}: {e}")
-                    failed_count += 1
+                        all_records.extend(records)
+                    total_records += len(records)
+                    parsed_count += 1
+                    del records
+                    
+                    if parsed_count % 10 == 0:
+                        self.logger.info(
+                            f"  Progress: {parsed_count}/{total_pdfs} PDFs parsed, "
+                            f"{total_records:,} records extracted"
+                        )
+                submit_more()
+        except BaseException:
+            for future in in_flight:
+                future.cancel()  # Don't leave this assembly's PDFs queued in the shared pool
+            raise
         
         self.logger.info(f"\nParse Results:")
         self.logger.info(f"  ✓ Parsed: {parsed_count}/{total_pdfs} PDFs")
         self.logger.info(f"  ✗ Failed: {failed_count} PDFs")
-        self.logger.info(f"  📊 Total Records: {len(all_records):,}")
+        self.logger.info(f"  📊 Total Records: {total_records:,}")
         
         # Save checkpoint
         parse_data = {
             'total_pdfs': total_pdfs,
             'parsed_pdfs': parsed_count,
             'failed_pdfs': failed_count,
-            'total_records': len(all_records),
-            'records': all_records  # Store records for stage 3
+            'total_records': total_records
         }
+        if sink is None:
+            parse_data['records'] = all_records  # Store records for stage 3
         
         self.checkpoint.save_checkpoint(
             state, assembly, 'parse', 'completed', parse_data
         )
         
-        self.logger.info(f"✓ Stage 2 Complete: {len(all_records):,} records extracted")
+        self.logger.info(f"✓ Stage 2 Complete: {total_records:,} records extracted")
         return parse_data
     
     def stage3_store(
@@ -265,8 +343,9 @@ class Pipeline:
             self.logger.info(f"Translating records using {self.max_translate_workers} workers...")
             records = self.translator.translate_batch(records)
         
-        # Store in database
-        new_count, updated_count = self.db_loader.batch_insert(records)
+        # Store in database (one transaction per constituency)
+        with self.db_loader.transaction():
+            new_count, updated_count = self.db_loader.batch_insert(records)
         
         self.logger.info(f"\nDatabase Results:")
         self.logger.info(f"  ✓ New records: {new_count:,}")
@@ -288,6 +367,81 @@ class Pipeline:
         self.logger.info(f"✓ Stage 3 Complete: Records stored in database")
         return store_data
     
+    def stage23_parse_and_store(
+        self,
+        state: str,
+        assembly: str,
+        base_dir: Path
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Stages 2 and 3 streamed: each PDF's records are inserted as soon as it is parsed
+        (with translation on, in batches of TRANSLATE_BATCH_RECORDS), so an assembly's
+        records are never all held in memory (or written to the checkpoint).
+        Returns (parse_data, store_data).
+        """
+        status = self.checkpoint.get_constituency_status(state, assembly)
+        parse_status = status.get('parse', {})
+        db_status = status.get('db', {})
+        if db_status.get('status') == 'completed':
+            self.logger.info(f"✓ Database storage already completed (skipping)")
+            return parse_status.get('data', {}), db_status['data']
+        if parse_status.get('status') == 'completed' and 'records' in parse_status.get('data', {}):
+            # Parsed by an earlier version, which kept the records in the checkpoint
+            parse_data = parse_status['data']
+            return parse_data, self.stage3_store(state, assembly, parse_data['records'])
+        
+        if db_status.get('status') == 'in_progress':
+            # An interrupted run committed part of this assembly (or new files were downloaded
+            # since it was stored): start it over
+            removed = self.db_loader.delete_assembly(state, assembly)
+            self.logger.info(f"Removed {removed:,} records stored by an interrupted run")
+        self.checkpoint.save_checkpoint(state, assembly, 'db', 'in_progress', {'started': True})
+        
+        new_count = updated_count = 0
+        translate = bool(self.translator and self.translator.enabled)
+        untranslated: List[Dict[str, Any]] = []  # Parsed records waiting for the next translate + insert
+        
+        def insert(records: List[Dict[str, Any]]):
+            nonlocal new_count, updated_count
+            if not records:
+                return
+            if translate:
+                records = self.translator.translate_batch(records)
+            inserted, updated = self.db_loader.batch_insert(records)
+            new_count += inserted
+            updated_count += updated
+        
+        def store(records: List[Dict[str, Any]]):
+            if not translate:
+                insert(records)
+                return
+            untranslated.extend(records)
+            if len(untranslated) >= TRANSLATE_BATCH_RECORDS:
+                insert(untranslated)
+                untranslated.clear()
+        
+        parse_data = self.stage2_parse(state, assembly, base_dir, sink=store)
+        insert(untranslated)
+        
+        self.logger.info(f"\nDatabase Results:")
+        self.logger.info(f"  ✓ New records: {new_count:,}")
+        self.logger.info(f"  ↻ Updated records: {updated_count:,}")
+        self.logger.info(f"  📊 Total stored: {new_count + updated_count:,}")
+        
+        # Save checkpoint
+        store_data = {
+            'total_records': parse_data['total_records'],
+            'inserted': new_count,
+            'updated': updated_count,
+            'stored_in_db': new_count + updated_count > 0
+        }
+        self.checkpoint.save_checkpoint(
+            state, assembly, 'db', 'completed', store_data
+        )
+        
+        self.logger.info(f"✓ Stage 3 Complete: Records stored in database")
+        return parse_data, store_data
+    
     async def process_constituency(
         self,
         state: str,
@@ -307,24 +461,33 @@ class Pipeline:
         }
         
         try:
-            # Stage 1: Download
-            download_data = await self.stage1_download(state, assembly, urls)
+            # Stage 1: Download. Each new ZIP is extracted (in a thread) as soon as it
+            # has arrived, while the rest of the assembly is still downloading.
+            extractions = []
+            
+            def extract_when_downloaded(download: Dict[str, Any]):
+                if download['success'] and not download['duplicate'] and download['filepath'].lower().endswith('.zip'):
+                    extractions.append(asyncio.create_task(
+                        asyncio.to_thread(self.extractor.extract_and_remove, Path(download['filepath']))
+                    ))
+            
+            try:
+                download_data = await self.stage1_download(state, assembly, urls, on_complete=extract_when_downloaded)
+            finally:
+                extracted = await asyncio.gather(*extractions)
             result['stages']['download'] = download_data
             
-            # Stage 2: Extract (if needed)
+            # Stage 2: Extract the remaining ZIPs (e.g. downloaded by an earlier run) and record all
             if download_data.get('successful', 0) > 0:
                 self.logger.info(f"\nExtracting ZIP files...")
-                extract_result = self.extractor.extract_assembly(state, assembly)
+                extract_result = await asyncio.to_thread(self.extractor.extract_assembly, state, assembly, extracted)
                 if extract_result and extract_result.get('pdfs'):
                     self.logger.info(f"✓ Extracted {len(extract_result['pdfs'])} PDFs")
             
-            # Stage 2: Parse
-            parse_data = self.stage2_parse(state, assembly, base_dir)
+            # Stages 2 and 3: Parse, storing each PDF's records as they come
+            # (off the event loop so crawling/downloads keep running)
+            parse_data, store_data = await asyncio.to_thread(self.stage23_parse_and_store, state, assembly, base_dir)
             result['stages']['parse'] = parse_data
-            
-            # Stage 3: Store
-            records = parse_data.get('records', [])
-            store_data = self.stage3_store(state, assembly, records)
             result['stages']['store'] = store_data
             
             # Final summary
@@ -344,4 +507,9 @@ class Pipeline:
             result['error'] = str(e)
         
         return result
-
+    
+    def close(self):
+        """Shut down the parse worker processes and the translation threads."""
+        self._parse_pool.shutdown(wait=True, cancel_futures=True)
+        if self.translator:
+            self.translator.close()
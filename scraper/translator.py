@@ -2,9 +2,13 @@
 Optional translator for converting OG text to English
 """
 
-from typing import List, Dict, Any, Optional
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import json
+import threading
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
 from .logger import Logger
+from .utils import ensure_dir
 
 # Optional translation import
 try:
@@ -13,11 +17,24 @@ try:
 except ImportError:
     TRANSLATION_AVAILABLE = False
 
+# (OG field, English field) pairs filled in by translation
+TRANSLATED_FIELDS = (
+    ('name_og', 'name_en'),
+    ('relation_og', 'relation_en'),
+    ('address_og', 'address_en'),
+)
+
 
 class VoterTranslator:
     """Translate voter data fields from original language to English."""
     
-    def __init__(self, logger: Logger, enabled: bool = True, max_workers: int = 4):
+    def __init__(
+        self,
+        logger: Logger,
+        enabled: bool = True,
+        max_workers: int = 4,
+        cache_file: str = "data/checkpoints/translations.jsonl"
+    ):
         self.logger = logger
         if enabled and not TRANSLATION_AVAILABLE:
             self.logger.warning("Translation requested but deep-translator not available")
@@ -25,15 +42,77 @@ class VoterTranslator:
         self.translator = GoogleTranslator(source='auto', target='en') if self.enabled else None
         self.max_workers = max_workers if self.enabled else 1
         self.batch_size = 50  # Batch size for translation
+        
+        # OG text → English translation from previous runs, so resumed and repeated
+        # assemblies don't translate the same names again
+        self.cache_file = Path(cache_file)
+        self.translations = self._load_translations() if self.enabled else {}
+        self._cache_lock = threading.Lock()
+        self._local = threading.local()  # GoogleTranslator of each worker thread
+        # Worker threads live for the whole run, so each keeps its translator across batches.
+        # Started on first use, as callers may still change max_workers (see Pipeline).
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+    
+    def _thread_translator(self):
+        """Return this thread's own translator, creating it on first use (falls back to the shared one)."""
+        translator = getattr(self._local, 'translator', None)
+        if translator is None:
+            try:
+                translator = GoogleTranslator(source='auto', target='en')
+            except Exception:
+                translator = self.translator
+            self._local.translator = translator
+        return translator
+    
+    def _load_translations(self) -> Dict[str, str]:
+        """Load translations recorded by previous runs (one JSON [text, translation] per line)."""
+        if not self.cache_file.exists():
+            return {}
+        translations = {}
+        with open(self.cache_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    text, translation = json.loads(line)
+                except ValueError:
+                    continue  # Line cut short by a crash
+                translations[text] = translation
+        return translations
+    
+    def _remember(self, pairs: List[Tuple[str, str]]):
+        """Add translations to the in-memory cache and append them to the cache file."""
+        if not pairs:
+            return
+        lines = "".join(json.dumps(pair, ensure_ascii=False) + "\n" for pair in pairs)
+        with self._cache_lock:
+            self.translations.update(pairs)
+            ensure_dir(self.cache_file.parent)
+            with open(self.cache_file, 'a', encoding='utf-8') as f:
+                f.write(lines)
+    
+    @staticmethod
+    def _needs_translation(text: str) -> bool:
+        """ASCII text (English names, house and EPIC numbers) is already English; only the rest goes to the translator."""
+        return bool(text) and not text.isascii()
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Return the translation thread pool, starting it on first use."""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="translate")
+            return self._executor
     
     def translate_text(self, text: str, source_lang: str = 'auto', target_lang: str = 'en') -> str:
         """Translate a single text string."""
-        if not self.enabled or not text or not self.translator:
+        if not self.enabled or not self._needs_translation(text) or not self.translator:
             return text
+        if text in self.translations:
+            return self.translations[text]
         
         try:
             # deep-translator handles auto-detection
             result = self.translator.translate(text)
+            self._remember([(text, result)])
             return result
         except Exception as e:
             self.logger.warning(f"Translation failed for '{text[:50]}...': {e}")
@@ -44,98 +123,91 @@ class VoterTranslator:
         if not self.enabled:
             return record
         
-        # Create a new translator instance for thread safety
-        # Each thread needs its own translator instance
-        try:
-            thread_translator = GoogleTranslator(source='auto', target='en')
-        except Exception:
-            thread_translator = self.translator
-        
-        # Translate name
-        if 'name_og' in record and record['name_og']:
-            try:
-                record['name_en'] = thread_translator.translate(record['name_og'])
-            except Exception as e:
-                self.logger.debug(f"Translation failed for name: {e}")
-                record['name_en'] = record.get('name_og', '')
-        
-        # Translate relation
-        if 'relation_og' in record and record['relation_og']:
-            try:
-                record['relation_en'] = thread_translator.translate(record['relation_og'])
-            except Exception as e:
-                self.logger.debug(f"Translation failed for relation: {e}")
-                record['relation_en'] = record.get('relation_og', '')
+        # Each thread needs its own translator instance (reused for its later records)
+        thread_translator = self._thread_translator()
         
-        # Translate address
-        if 'address_og' in record and record['address_og']:
+        # Translate name, relation and address
+        for og_field, en_field in TRANSLATED_FIELDS:
+            text = record.get(og_field)
+            if not text:
+                continue
+            if not self._needs_translation(text):
+                record[en_field] = text
+                continue
             try:
-                record['address_en'] = thread_translator.translate(record['address_og'])
+                record[en_field] = thread_translator.translate(text)
             except Exception as e:
-                self.logger.debug(f"Translation failed for address: {e}")
-                record['address_en'] = record.get('address_og', '')
+                self.logger.debug(f"Translation failed for {og_field[:-3]}: {e}")
+                record[en_field] = text
         
         return record
     
     def translate_batch(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Translate a batch of records using parallel workers."""
+        """
+        Translate a batch of records using parallel workers. Each distinct OG string is
+        translated once (names recur across a voter roll), or taken from the translation
+        cache, and the results are filled in for every record; a string that fails to
+        translate is kept as is.
+        """
         if not self.enabled:
             return records
         
-        total_records = len(records)
-        self.logger.info(f"Translating {total_records:,} records using {self.max_workers} workers...")
+        # Distinct OG strings across all records and fields (dict keeps first-seen order)
+        distinct = dict.fromkeys(
+            record[og_field]
+            for record in records
+            for og_field, _ in TRANSLATED_FIELDS
+            if self._needs_translation(record.get(og_field))
+        )
+        texts = [text for text in distinct if text not in self.translations]
+        total_texts = len(texts)
+        self.logger.info(
+            f"Translating {total_texts:,} distinct values from {len(records):,} records "
+            f"({len(distinct) - total_texts:,} cached) using {self.max_workers} workers..."
+        )
         
-        # Use ThreadPoolExecutor for parallel translation
-        translated = [None] * total_records  # Pre-allocate list to maintain order
         completed_count = 0
         failed_count = 0
         
-        def translate_single_record(index: int, record: Dict[str, Any]) -> tuple:
-            """Translate a single record and return (index, translated_record, success)."""
-            try:
-                translated_record = self.translate_record(record)
-                return (index, translated_record, True)
-            except Exception as e:
-                self.logger.debug(f"Translation error for record {index}: {e}")
-                return (index, record, False)
-        
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            # Submit all tasks
-            future_to_index = {
-                executor.submit(translate_single_record, i, record): i
-                for i, record in enumerate(records)
-            }
-            
-            # Process results as they complete
-            for future in as_completed(future_to_index):
+        def translate_chunk(chunk: List[str]) -> List[Tuple[str, Optional[str]]]:
+            """Translate a chunk of strings with this thread's own translator (None: failed)."""
+            chunk_translator = self._thread_translator()
+            results = []
+            for text in chunk:
                 try:
-                    index, translated_record, success = future.result()
-                    translated[index] = translated_record
-                    completed_count += 1
-                    
-                    if not success:
-                        failed_count += 1
-                    
-                    # Progressive logging: every 10 records for small batches, every 50 for large batches
-                    log_interval = 10 if total_records < 1000 else 50
-                    if completed_count % log_interval == 0 or completed_count == total_records:
-                        progress_pct = (completed_count / total_records * 100) if total_records > 0 else 0
-                        self.logger.info(
-                            f"  Translation progress: {completed_count:,}/{total_records:,} "
-                            f"({progress_pct:.1f}%) - {failed_count} failed"
-                        )
-                
+                    results.append((text, chunk_translator.translate(text)))
                 except Exception as e:
-                    index = future_to_index[future]
-                    self.logger.warning(f"Translation error for record {index}: {e}")
-                    translated[index] = records[index]  # Keep original if translation fails
-                    completed_count += 1
-                    failed_count += 1
+                    self.logger.debug(f"Translation failed for '{text[:50]}': {e}")
+                    results.append((text, None))
+            return results
+        
+        chunks = [texts[i:i + self.batch_size] for i in range(0, total_texts, self.batch_size)]
+        for results in self._get_executor().map(translate_chunk, chunks):
+            translated = [(text, translation) for text, translation in results if translation is not None]
+            self._remember(translated)
+            failed_count += len(results) - len(translated)
+            completed_count += len(results)
+            self.logger.info(
+                f"  Translation progress: {completed_count:,}/{total_texts:,} "
+                f"({completed_count / total_texts * 100:.1f}%) - {failed_count} failed"
+            )
+        
+        for record in records:
+            for og_field, en_field in TRANSLATED_FIELDS:
+                text = record.get(og_field)
+                if text:
+                    record[en_field] = self.translations.get(text, text)
         
         self.logger.info(
-            f"✓ Translation complete: {completed_count:,}/{total_records:,} records "
+            f"✓ Translation complete: {completed_count:,}/{total_texts:,} values "
             f"({failed_count} failed)"
         )
         
-        return translated
-
+        return records
+    
+    def close(self):
+        """Shut down the translation worker threads."""
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=True, cancel_futures=True)
@@ -2,12 +2,21 @@
 Utility functions for the SIR data scraper
 """
 
+import functools
 import os
 import json
+import unicodedata
 from pathlib import Path
 from typing import Dict, Any, Optional
 from datetime import datetime
 
+# Optional fast JSON (falls back to stdlib json)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 
 def ensure_dir(path: str) -> Path:
     """Ensure directory exists, create if not."""
@@ -16,19 +25,44 @@ def ensure_dir(path: str) -> Path:
     return dir_path
 
 
+def _json_default(obj: Any) -> Any:
+    """Serialize sets as sorted lists."""
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps_json(obj: Any, pretty: bool = False) -> bytes:
+    """Serialize to UTF-8 JSON bytes (compact unless pretty; sets become sorted lists)."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, default=_json_default, option=orjson.OPT_INDENT_2 if pretty else 0)
+    if pretty:
+        return json.dumps(obj, indent=2, ensure_ascii=False, default=_json_default).encode('utf-8')
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False, default=_json_default).encode('utf-8')
+
+
+def loads_json(data: bytes) -> Any:
+    """Deserialize JSON bytes."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
 def load_checkpoint(checkpoint_path: str) -> Dict[str, Any]:
     """Load checkpoint JSON if exists."""
     if os.path.exists(checkpoint_path):
-        with open(checkpoint_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        with open(checkpoint_path, 'rb') as f:
+            return loads_json(f.read())
     return {}
 
 
 def save_checkpoint(checkpoint_path: str, data: Dict[str, Any]) -> None:
-    """Save checkpoint JSON."""
+    """Save checkpoint JSON (compact) atomically (a crash mid-write leaves the old file intact)."""
     ensure_dir(os.path.dirname(checkpoint_path))
-    with open(checkpoint_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    tmp_path = f"{checkpoint_path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(dumps_json(data))
+    os.replace(tmp_path, checkpoint_path)
 
 
 def get_timestamp() -> str:
@@ -36,12 +70,27 @@ def get_timestamp() -> str:
     return datetime.now().strftime("%Y-%m-%dT%H-%M-%S")
 
 
+# Characters not allowed in file names, mapped to '_'
+_INVALID_FILENAME_CHARS = str.maketrans({char: '_' for char in '<>:"/\\|?*'})
+
+
+@functools.lru_cache(maxsize=4096)
 def sanitize_filename(name: str) -> str:
     """Sanitize filename by removing invalid characters."""
-    invalid_chars = '<>:"/\\|?*'
-    for char in invalid_chars:
-        name = name.replace(char, '_')
-    return name.strip()
+    # Cached: the same state/assembly names come through for every URL and stage
+    return name.translate(_INVALID_FILENAME_CHARS).strip()
+
+
+# Zero-width (non-)joiners that OCR scatters through Indic text, dropped by normalize_text
+_ZERO_WIDTH_JOINERS = str.maketrans('', '', '\u200c\u200d')
+
+
+def normalize_text(text: str) -> str:
+    """
+    Canonical form of extracted text (NFC, zero-width joiners removed, stripped), so
+    values that look the same also compare equal (e.g. when deduplicating translations).
+    """
+    return unicodedata.normalize('NFC', text.translate(_ZERO_WIDTH_JOINERS)).strip()
 
 
 def format_size(size_bytes: int) -> str: